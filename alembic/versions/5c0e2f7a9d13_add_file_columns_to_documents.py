@@ -0,0 +1,32 @@
+"""add file columns to documents
+
+Revision ID: 5c0e2f7a9d13
+Revises: 8601977e420f
+Create Date: 2026-10-18 14:20:41.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e2f7a9d13'
+down_revision: Union[str, None] = '8601977e420f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('documents', sa.Column('storage_key', sa.String(), nullable=True))
+    op.add_column('documents', sa.Column('content_type', sa.String(), nullable=True))
+    op.add_column('documents', sa.Column('size', sa.BigInteger(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('documents', 'size')
+    op.drop_column('documents', 'content_type')
+    op.drop_column('documents', 'storage_key')
@@ -0,0 +1,30 @@
+"""add owner updated_at index to documents
+
+Revision ID: 7d3f1b0c8e26
+Revises: e41b9a6c2f58
+Create Date: 2026-10-18 16:32:55.902148
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d3f1b0c8e26'
+down_revision: Union[str, None] = 'e41b9a6c2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index('ix_documents_owner_id_updated_at', 'documents', ['owner_id', 'updated_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_documents_owner_id_updated_at', table_name='documents', postgresql_concurrently=True)
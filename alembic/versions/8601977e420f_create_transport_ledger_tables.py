@@ -0,0 +1,50 @@
+"""create transport ledger tables
+
+Revision ID: 8601977e420f
+Revises: b26c7d7da79b
+Create Date: 2026-10-18 11:02:17.540126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8601977e420f'
+down_revision: Union[str, None] = 'b26c7d7da79b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('transport_balances',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Numeric(precision=12, scale=2, asdecimal=False), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('transport_ledger',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2, asdecimal=False), nullable=False),
+    sa.Column('balance_after', sa.Numeric(precision=12, scale=2, asdecimal=False), nullable=False),
+    sa.Column('idempotency_key', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'idempotency_key', name='uq_transport_ledger_user_id_idempotency_key')
+    )
+    op.create_index(op.f('ix_transport_ledger_id'), 'transport_ledger', ['id'], unique=False)
+    op.create_index(op.f('ix_transport_ledger_user_id'), 'transport_ledger', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_transport_ledger_user_id'), table_name='transport_ledger')
+    op.drop_index(op.f('ix_transport_ledger_id'), table_name='transport_ledger')
+    op.drop_table('transport_ledger')
+    op.drop_table('transport_balances')
@@ -0,0 +1,34 @@
+"""add owner indexes to documents
+
+Revision ID: b26c7d7da79b
+Revises: 03738e751f65
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b26c7d7da79b'
+down_revision: Union[str, None] = '03738e751f65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY cannot run inside a transaction, but keeps the table writable
+    # while the indexes are built on Postgres.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_documents_owner_id_id', 'documents', ['owner_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_documents_owner_id_created_at', 'documents', ['owner_id', 'created_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_documents_owner_id_created_at', table_name='documents', postgresql_concurrently=True)
+        op.drop_index('ix_documents_owner_id_id', table_name='documents', postgresql_concurrently=True)
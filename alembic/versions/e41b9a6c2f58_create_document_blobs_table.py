@@ -0,0 +1,43 @@
+"""create document blobs table
+
+Revision ID: e41b9a6c2f58
+Revises: 5c0e2f7a9d13
+Create Date: 2026-10-18 15:47:03.284611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41b9a6c2f58'
+down_revision: Union[str, None] = '5c0e2f7a9d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('document_blobs',
+    sa.Column('storage_key', sa.String(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('storage_key')
+    )
+    # Files uploaded before deduplication keep their random key: one blob each
+    op.execute(
+        "INSERT INTO document_blobs (storage_key, size) "
+        "SELECT storage_key, MAX(size) FROM documents "
+        "WHERE storage_key IS NOT NULL GROUP BY storage_key"
+    )
+    op.create_index(op.f('ix_documents_storage_key'), 'documents', ['storage_key'], unique=False)
+    op.create_foreign_key('fk_documents_storage_key_document_blobs', 'documents', 'document_blobs', ['storage_key'], ['storage_key'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_documents_storage_key_document_blobs', 'documents', type_='foreignkey')
+    op.drop_index(op.f('ix_documents_storage_key'), table_name='documents')
+    op.drop_table('document_blobs')
@@ -0,0 +1,98 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe LRU cache with an optional time-to-live per entry.
+    When `maxsize` is reached the least recently used entry is evicted.
+    """
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[K, Tuple[V, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K) -> Optional[V]:
+        """Returns the cached value, or None if it is missing or expired."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        """Stores a value; `ttl` overrides the default time-to-live of the cache."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: K) -> Optional[V]:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return item[0] if item else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: object) -> bool:
+        """Checks for a live entry without refreshing its LRU position."""
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and (item[1] is None or item[1] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SharedCacheBackend(ABC):
+    """
+    String key/value cache shared by every worker process (e.g. Redis or Memcached).
+    """
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        ...
+
+
+class InMemorySharedCache(SharedCacheBackend):
+    """
+    Stand-in for a shared cache backend that lives in the current process,
+    for development and tests.
+    """
+    def __init__(self, maxsize: int = 10_000):
+        self._cache: TTLCache[str, str] = TTLCache(maxsize=maxsize)
+
+    def get(self, key: str) -> Optional[str]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._cache.set(key, value, ttl=ttl)
+
+
+def build_shared_cache(backend: Optional[str]) -> Optional[SharedCacheBackend]:
+    """Builds the shared cache configured by name; None disables it."""
+    if backend is None:
+        return None
+    if backend == "memory":
+        return InMemorySharedCache()
+    raise ValueError(f"Unknown shared cache backend: {backend}")
@@ -0,0 +1,189 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# brotli and zstandard are optional: their encodings are offered only when installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Bodies that are already compressed, or must reach the client unbuffered (SSE)
+UNCOMPRESSIBLE_PREFIXES = (
+    "image/", "video/", "audio/", "application/pdf", "application/zip", "application/gzip",
+    "application/octet-stream", "text/event-stream",
+)
+
+
+class Compressor(ABC):
+    """
+    Streaming compressor of one response. `compress` returns the bytes ready to be
+    sent for a chunk (flushed, so every chunk of a stream reaches the client right
+    away) and `finish` closes the stream.
+    """
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """Compresses a chunk and flushes it."""
+
+    @abstractmethod
+    def finish(self) -> bytes:
+        """Ends the stream."""
+
+
+class GzipCompressor(Compressor):
+    def __init__(self, level: int):
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class BrotliCompressor(Compressor):
+    def __init__(self, level: int):
+        self._brotli = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) + self._brotli.flush()
+
+    def finish(self) -> bytes:
+        return self._brotli.finish()
+
+
+class ZstdCompressor(Compressor):
+    def __init__(self, level: int):
+        self._zstd = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._zstd.compress(data) + self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._zstd.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def available_codecs() -> Dict[str, type]:
+    """Encodings this process can produce, in order of preference."""
+    codecs: Dict[str, type] = {}
+    if zstandard is not None:
+        codecs["zstd"] = ZstdCompressor
+    if brotli is not None:
+        codecs["br"] = BrotliCompressor
+    codecs["gzip"] = GzipCompressor
+    return codecs
+
+
+def choose_encoding(accept_encoding: str, supported: Sequence[str]) -> Optional[str]:
+    """
+    Picks the encoding for an Accept-Encoding header: the highest q-value wins, ties
+    go to the order of `supported`. Returns None when none is acceptable.
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[name.strip().lower()] = quality
+
+    candidates: List[Tuple[float, int, str]] = []
+    for preference, encoding in enumerate(supported):
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > 0:
+            candidates.append((-quality, preference, encoding))
+    return min(candidates)[2] if candidates else None
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with zstd, brotli or gzip according to Accept-Encoding.
+    Bodies smaller than `minimum_size` (when sent in one piece), already encoded,
+    partial (206) or of an uncompressible type pass through untouched. Streaming
+    responses (NDJSON exports) are compressed chunk by chunk, each chunk flushed.
+    """
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, levels: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+        self.codecs = available_codecs()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), list(self.codecs))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(send, encoding, self.codecs[encoding], self.levels[encoding], self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, send: Send, encoding: str, codec: type, level: int, minimum_size: int):
+        self._send = send
+        self.encoding = encoding
+        self.codec = codec
+        self.level = level
+        self.minimum_size = minimum_size
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[Compressor] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk tells whether to compress
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                message["status"] in (204, 206, 304)
+                or "content-encoding" in headers
+                or content_type.startswith(UNCOMPRESSIBLE_PREFIXES)
+            )
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            # Zero-copy file extensions and untouched responses
+            await self._flush_start()
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self._send(message)
+                return
+            self.compressor = self.codec(self.level)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            del headers["Content-Length"]
+            self.start_message["headers"] = headers.raw
+            await self._flush_start()
+
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _flush_start(self) -> None:
+        if self.start_message is not None:
+            await self._send(self.start_message)
+            self.start_message = None
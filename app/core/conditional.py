@@ -0,0 +1,67 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Header, Response, status
+
+
+def make_etag(*parts: object) -> str:
+    """Weak ETag (the body may be compressed differently) from the values that version a resource."""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _as_utc(moment: datetime) -> datetime:
+    # SQLite hands back naive datetimes; the database clock is UTC
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+class ConditionalRequest(NamedTuple):
+    """The If-None-Match / If-Modified-Since headers of a GET."""
+    if_none_match: Optional[str] = None
+    if_modified_since: Optional[str] = None
+
+
+def get_conditional_request(
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+) -> ConditionalRequest:
+    return ConditionalRequest(if_none_match, if_modified_since)
+
+
+class CacheValidators(NamedTuple):
+    """ETag and Last-Modified of a representation."""
+    etag: str
+    last_modified: Optional[datetime] = None
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag}
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(_as_utc(self.last_modified), usegmt=True)
+        return headers
+
+    def not_modified(self, conditions: Optional[ConditionalRequest]) -> bool:
+        """
+        Whether the client copy is current (RFC 9110 section 13.2.2): If-None-Match is
+        compared weakly and, when present, If-Modified-Since is ignored.
+        """
+        if conditions is None:
+            return False
+        if conditions.if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in conditions.if_none_match.split(",")}
+            return "*" in tags or self.etag.removeprefix("W/") in tags
+        if conditions.if_modified_since is not None and self.last_modified is not None:
+            try:
+                since = parsedate_to_datetime(conditions.if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            # HTTP dates have a resolution of one second
+            return _as_utc(self.last_modified).replace(microsecond=0) <= _as_utc(since)
+        return False
+
+
+def not_modified_response(validators: CacheValidators) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators.headers())
@@ -1,18 +1,99 @@
-from passlib.context import CryptContext
-from typing import Callable
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Optional
 
+from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@lru_cache
+def get_pwd_context():
+    """The CryptContext, built on first use: passlib is only needed once a password is checked."""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 PasswordHasher = Callable[[str], str]
 PasswordVerifier = Callable[[str, str], bool]
 
+# Stored instead of a hash for accounts that cannot log in with a password (e.g. OAuth)
+UNUSABLE_PASSWORD = "!"
+
+
+def is_password_usable(hashed_password: str) -> bool:
+    """Tells whether the stored value is a real hash and not the unusable sentinel."""
+    return not hashed_password.startswith(UNUSABLE_PASSWORD)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifies if the plain password matches the hashed password."""
-    return pwd_context.verify(plain_password, hashed_password)
+    if not is_password_usable(hashed_password):
+        return False
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Generates the hash of a plain password."""
-    return pwd_context.hash(password)
\ No newline at end of file
+    return get_pwd_context().hash(password)
+
+
+class HashingPoolSaturated(Exception):
+    """Raised when the hashing pool already has `max_pending` operations; the API answers 503."""
+
+
+class PasswordHashingPool:
+    """
+    Runs bcrypt in a dedicated, size-limited process pool so that hashing never blocks
+    the event loop nor the request threadpool.
+    At most `max_pending` operations may be queued or running; beyond that it raises
+    HashingPoolSaturated and callers should retry later.
+    """
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 64):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashingPoolSaturated(f"{self.max_pending} hashing operations already pending")
+            self._pending += 1
+        try:
+            return await asyncio.wrap_future(self._get_executor().submit(fn, *args))
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Generates the hash of a plain password in the worker pool."""
+        return await self._run(get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verifies a plain password against its hash in the worker pool."""
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_hashing_pool = PasswordHashingPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
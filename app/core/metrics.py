@@ -0,0 +1,189 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+LabelValues = Tuple[str, ...]
+
+
+class RequestTimings:
+    """Where the time of one request went; filled in by the DB hooks and GetCurrentUser."""
+    __slots__ = ("db_queries", "db_seconds", "auth_seconds")
+
+    def __init__(self):
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.auth_seconds = 0.0
+
+
+# Set by MetricsMiddleware; the threadpool copies the context, so sync routes share the object
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_db_query(seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.db_queries += 1
+        timings.db_seconds += seconds
+
+
+@contextmanager
+def track_auth() -> Iterator[None]:
+    """Adds the time spent in the block to the auth time of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.auth_seconds += time.perf_counter() - start
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: LabelValues = (), amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: count per bucket (not cumulative), sum, count
+        self._values: Dict[LabelValues, Tuple[List[int], float, int]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        with self._lock:
+            counts, total, count = self._values.get(labels) or ([0] * len(self.buckets), 0.0, 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[labels] = (counts, total + value, count + 1)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    le = 'le="%g"' % bound
+                    lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {count}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {total:g}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class RequestMetrics:
+    """Process-wide request metrics, rendered in the Prometheus text format by /metrics."""
+    def __init__(self):
+        route = ("method", "route")
+        self.requests = Counter("http_requests_total", "Requests by route and status code.", route + ("status",))
+        self.latency = Histogram("http_request_duration_seconds", "Request latency until the response is sent.", route)
+        self.db_queries = Histogram("http_request_db_queries", "Database queries per request.", route, QUERY_COUNT_BUCKETS)
+        self.db_seconds = Histogram("http_request_db_duration_seconds", "Time in database queries per request.", route)
+        self.auth_seconds = Histogram("http_request_auth_duration_seconds", "Time authenticating the bearer token per request.", route)
+
+    def observe(self, method: str, route: str, status: int, seconds: float, timings: RequestTimings) -> None:
+        labels = (method, route)
+        self.requests.inc(labels + (str(status),))
+        self.latency.observe(seconds, labels)
+        self.db_queries.observe(timings.db_queries, labels)
+        self.db_seconds.observe(timings.db_seconds, labels)
+        if timings.auth_seconds:
+            self.auth_seconds.observe(timings.auth_seconds, labels)
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for metric in (self.requests, self.latency, self.db_queries, self.db_seconds, self.auth_seconds):
+            lines.extend(metric.render())
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+
+def server_timing(timings: RequestTimings, seconds: float) -> str:
+    return (
+        f'app;dur={seconds * 1000:.1f}, '
+        f'db;dur={timings.db_seconds * 1000:.1f};desc="{timings.db_queries} queries", '
+        f'auth;dur={timings.auth_seconds * 1000:.1f}'
+    )
+
+
+class MetricsMiddleware:
+    """
+    Times every request, with the DB and auth time collected while it runs, and
+    records it per route template (so /documents/{document_id} is one series).
+    Adds a Server-Timing header with the same figures when `server_timing` is on;
+    for streaming responses they cover the work done before the headers were sent.
+    """
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics, server_timing: bool = True):
+        self.app = app
+        self.metrics = metrics
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(timings, time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            # FastAPI stores the matched route in the scope; unmatched paths share one series
+            route = getattr(scope.get("route"), "path", "unmatched")
+            self.metrics.observe(scope["method"], route, status, time.perf_counter() - start, timings)
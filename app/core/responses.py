@@ -0,0 +1,16 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response for content that is already validated: pydantic models, lists and
+    dicts of them. Returning it from a route (instead of the models) makes FastAPI
+    skip the second validation against `response_model` and the jsonable_encoder
+    pass, and pydantic-core writes the JSON straight from the models.
+    Keep `response_model` on the route: it still documents the body in OpenAPI.
+    """
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
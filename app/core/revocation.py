@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite returns naive datetimes; they are stored in UTC
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class BloomFilter:
+    """
+    Fixed-size set of strings that may answer "maybe" for a string never added (with
+    probability `error_rate` while it holds at most `capacity` items), but never "no"
+    for one that was.
+    """
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing: the k positions come from the two halves of a single digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class RevocationList:
+    """
+    The ids (jti) of the revoked tokens that have not expired, held by every worker.
+    Nearly every token checked was never revoked: the Bloom filter rules those out and
+    only its rare "maybe" goes to the exact set. Expired entries are pruned, which also
+    rebuilds the filter since bits can't be removed from it.
+    """
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._expires_at: Dict[str, float] = {}
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        # Read without the lock, as every request checks its token. _rebuild swaps in a new,
+        # complete filter instead of changing the one in use, and add() stores the jti in
+        # the dict before setting its bits, so a "maybe" of the filter is always backed by
+        # the dict (whose lookups are atomic under the GIL).
+        # Tokens issued before jti existed can't be revoked
+        bloom = self._bloom
+        if jti is None or jti not in bloom:
+            return False
+        return jti in self._expires_at
+
+    def add(self, jti: str, expires_at: float) -> None:
+        with self._lock:
+            self._expires_at[jti] = expires_at
+            if len(self._expires_at) > self.capacity:
+                self._rebuild()
+            else:
+                self._bloom.add(jti)
+
+    def load(self, rows) -> None:
+        """Adds the rows of revoked_tokens (jti, expires_at) that are not known yet."""
+        for row in rows:
+            if row.jti not in self._expires_at:
+                self.add(row.jti, _timestamp(row.expires_at))
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Forgets the tokens that already expired and returns how many there were."""
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [jti for jti, expires_at in self._expires_at.items() if expires_at <= now]
+            for jti in expired:
+                del self._expires_at[jti]
+            if expired:
+                self._rebuild()
+        return len(expired)
+
+    def _rebuild(self) -> None:
+        # Grows the filter before it goes past its capacity and its error rate climbs
+        while len(self._expires_at) > self.capacity:
+            self.capacity *= 2
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        for jti in self._expires_at:
+            bloom.add(jti)
+        self._bloom = bloom
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires_at.clear()
+            self._bloom = BloomFilter(self.capacity, self.error_rate)
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+
+revocation_list = RevocationList(
+    capacity=settings.REVOCATION_BLOOM_CAPACITY,
+    error_rate=settings.REVOCATION_BLOOM_ERROR_RATE,
+)
+
+
+def sync_revocation_list(repo, revocations: RevocationList = revocation_list) -> None:
+    """
+    Loads the tokens revoked by any worker and prunes the expired ones, also from the table.
+    Every sync reads all the unexpired rows: expired ones are deleted, so the table stays
+    about as small as the list, and rows committed late or out of order are never missed.
+    """
+    now = datetime.now(timezone.utc)
+    revocations.load(repo.get_unexpired(now))
+    if revocations.prune(now.timestamp()):
+        repo.delete_expired(now)
+
+
+def _sync_from_database() -> None:
+    from app.db.session import get_sessionmaker
+    from app.repos.token import RevokedTokenRepository
+
+    with get_sessionmaker()() as db:
+        sync_revocation_list(RevokedTokenRepository(db))
+
+async def refresh_revocation_list() -> None:
+    """One sync of the revocation list, in the threadpool; failures are only logged."""
+    from starlette.concurrency import run_in_threadpool
+
+    try:
+        await run_in_threadpool(_sync_from_database)
+    except Exception:
+        logger.exception("Could not sync the token revocation list")
+
+async def run_revocation_sync(interval: float) -> None:
+    """Background task of the app lifespan: syncs the revocation list every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        await refresh_revocation_list()
@@ -1,44 +1,128 @@
+import threading
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
-from typing import Any, Union
+from pydantic import ValidationError
+from sqlalchemy import event
+from typing import Any, Dict, NamedTuple, Optional, Set, Union
 
+from app.core.cache import TTLCache
 from app.core.config import settings
-from app.db.session import get_db
-from app.dependencies import get_user_service_dependency
+from app.core.metrics import track_auth
+from app.core.revocation import revocation_list
+from app.dependencies import get_async_user_service_dependency, get_user_service_dependency
 
-from app.services.user import UserService
+from app.services.user import AsyncUserService, UserService
 from app.schemas.user import User as UserSchema
 from app.models.user import User as UserModel
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+@lru_cache
+def _jwt():
+    """
+    python-jose's jwt module, imported on the first token: it (and the cryptography
+    backend it loads) is not needed at startup.
+    """
+    from jose import jwt
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+    return jwt
 
 def create_access_token(data: dict, expires_delta: Union[timedelta, None] = None):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    # Unique id of the token, which is what gets revoked
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    return _jwt().encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def user_claims(user: UserSchema) -> dict[str, Any]:
+    """
+    Claims of an access token that carry the whole UserSchema, so that requests with it
+    are authenticated without loading the user.
+    """
+    claims = user.model_dump(mode="json", exclude={"id"})
+    claims["sub"] = str(user.id)
+    return claims
 
 def decode_access_token(token: str) -> Union[dict[str, Any], None]:
+    jwt = _jwt()
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         return payload
-    except JWTError:
+    except jwt.JWTError:
         return None
 
+class VerifiedToken(NamedTuple):
+    user: UserSchema
+    jti: Optional[str]
+
+class VerifiedTokenCache:
+    """
+    Bounded TTL/LRU cache of already verified tokens and the user they resolve to.
+    Entries never outlive the token expiration and are dropped when the user changes.
+    """
+    def __init__(self, maxsize: int, ttl: int):
+        self.ttl = ttl
+        self._cache: TTLCache[str, VerifiedToken] = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[VerifiedToken]:
+        return self._cache.get(token)
+
+    def set(self, token: str, user: UserSchema, expires_at: Optional[float], jti: Optional[str] = None) -> None:
+        if self.ttl <= 0:
+            return
+        ttl = float(self.ttl)
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        self._cache.set(token, VerifiedToken(user, jti), ttl=ttl)
+        with self._lock:
+            # Tokens evicted from the LRU or expired leave stale references behind
+            tokens = {t for t in self._tokens_by_user.get(user.id, ()) if t in self._cache}
+            tokens.add(token)
+            self._tokens_by_user[user.id] = tokens
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drops every cached token of a user; call it whenever the user changes."""
+        with self._lock:
+            tokens = self._tokens_by_user.pop(user_id, set())
+        for token in tokens:
+            self._cache.pop(token)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens_by_user.clear()
+        self._cache.clear()
+
+
+verified_token_cache = VerifiedTokenCache(
+    maxsize=settings.AUTH_CACHE_MAX_SIZE,
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+)
+
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: UserModel) -> None:
+    # Only matters for tokens with just `sub`, which load the user again. Tokens with the
+    # user's claims keep them until they expire (ACCESS_TOKEN_EXPIRE_MINUTES); changes such
+    # as deactivating the user take effect at the next refresh, which loads the user.
+    verified_token_cache.invalidate_user(target.id)
+
+
 class GetCurrentUser:
+    """
+    Resolves the user of the bearer token. Tokens issued by login and refresh carry the
+    user's claims and are served without a query; tokens with only `sub` load the user.
+    """
     def __init__(self, oauth_scheme: OAuth2PasswordBearer = Depends(oauth2_scheme)):
         self.oauth_scheme = oauth_scheme
 
@@ -46,29 +130,94 @@ class GetCurrentUser:
         token: str = Depends(oauth2_scheme),
         user_service: UserService = Depends(get_user_service_dependency)
     ) -> UserSchema:
-        credentials_exception = HTTPException(
+        with track_auth():
+            cached = self._cached_user(token)
+            if cached is not None:
+                return cached
+
+            payload, user_id = self._verify_token(token)
+            user = self._user_from_claims(payload, user_id)
+            if user is None:
+                try:
+                    user_orm = user_service.get_user_by_id(user_id)
+                except Exception:
+                     raise self._credentials_exception()
+                user = self._user_from_model(user_orm)
+
+            return self._remember(token, payload, user)
+
+    @staticmethod
+    def _credentials_exception() -> HTTPException:
+        return HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    def _cached_user(self, token: str) -> Optional[UserSchema]:
+        """The user of an already verified token, unless it was revoked since."""
+        cached = verified_token_cache.get(token)
+        if cached is None:
+            return None
+        if revocation_list.is_revoked(cached.jti):
+            raise self._credentials_exception()
+        return cached.user
+
+    def _verify_token(self, token: str) -> tuple[dict[str, Any], int]:
+        """Decodes the token and returns its payload and the id of its user."""
         payload = decode_access_token(token)
-        if payload is None:
-            raise credentials_exception
+        if payload is None or revocation_list.is_revoked(payload.get("jti")):
+            raise self._credentials_exception()
 
         user_id: str | None = payload.get("sub")
         if user_id is None:
-            raise credentials_exception
+            raise self._credentials_exception()
 
         try:
-            user_orm = user_service.get_user_by_id(int(user_id))
-        except Exception:
-             raise credentials_exception
-
+            return payload, int(user_id)
+        except ValueError:
+            raise self._credentials_exception()
+
+    def _user_from_claims(self, payload: dict[str, Any], user_id: int) -> Optional[UserSchema]:
+        """The user carried by the token (see user_claims); None for tokens with only its id."""
+        if "email" not in payload:
+            return None
+        try:
+            return UserSchema.model_validate({**payload, "id": user_id})
+        except ValidationError:
+            raise self._credentials_exception()
 
+    def _user_from_model(self, user_orm: UserModel | None) -> UserSchema:
         if user_orm is None:
-            raise credentials_exception
-
+            raise self._credentials_exception()
         return UserSchema.model_validate(user_orm)
 
+    def _remember(self, token: str, payload: dict[str, Any], user: UserSchema) -> UserSchema:
+        verified_token_cache.set(token, user, expires_at=payload.get("exp"), jti=payload.get("jti"))
+        return user
+
+
+class GetCurrentUserAsync(GetCurrentUser):
+    """GetCurrentUser for the async routes: tokens without claims load the user through an AsyncSession."""
+    async def __call__(self,
+        token: str = Depends(oauth2_scheme),
+        user_service: AsyncUserService = Depends(get_async_user_service_dependency)
+    ) -> UserSchema:
+        with track_auth():
+            cached = self._cached_user(token)
+            if cached is not None:
+                return cached
+
+            payload, user_id = self._verify_token(token)
+            user = self._user_from_claims(payload, user_id)
+            if user is None:
+                try:
+                    user_orm = await user_service.get_user_by_id(user_id)
+                except Exception:
+                     raise self._credentials_exception()
+                user = self._user_from_model(user_orm)
+
+            return self._remember(token, payload, user)
+
 get_current_user = GetCurrentUser()
+get_current_user_async = GetCurrentUserAsync()
@@ -1,3 +1,5 @@
 from app.db.base_class import Base
 from app.models.user import User
-from app.models.document import Document
+from app.models.document import Document, DocumentBlob
+from app.models.transport import TransportBalance, TransportLedgerEntry
+from app.models.token import RefreshToken, RevokedToken
@@ -0,0 +1,14 @@
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, model):
+    """
+    Returns an INSERT for `model` that supports ON CONFLICT clauses on the session's
+    database (Postgres in production, SQLite in tests).
+    """
+    # Imported here so that only the dialect in use gets loaded
+    if db.get_bind().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(model)
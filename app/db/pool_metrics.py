@@ -0,0 +1,113 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolMetrics:
+    """
+    Process-wide counters about how the connection pools behave: checkouts, time spent
+    waiting for a connection, overflow and timeouts.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.wait_count = 0
+            self.wait_seconds_total = 0.0
+            self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def _increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def attach(self, engine: Engine) -> None:
+        """Counts the checkouts, checkins, connects and invalidations of an engine's pool."""
+        event.listen(engine, "checkout", lambda *args: self._increment("checkouts"))
+        event.listen(engine, "checkin", lambda *args: self._increment("checkins"))
+        event.listen(engine, "connect", lambda *args: self._increment("connects"))
+        event.listen(engine, "invalidate", lambda *args: self._increment("invalidations"))
+
+    def snapshot(self, pools: Optional[Dict[str, Pool]] = None) -> Dict[str, Any]:
+        """Current counters plus the size/overflow gauges of the given pools."""
+        with self._lock:
+            data: Dict[str, Any] = {
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_seconds_avg": self.wait_seconds_total / self.wait_count if self.wait_count else 0.0,
+                "wait_seconds_max": self.wait_seconds_max,
+            }
+        data["pools"] = {name: pool_gauges(pool) for name, pool in (pools or {}).items()}
+        return data
+
+    def prometheus_lines(self, pools: Optional[Dict[str, Pool]] = None) -> List[str]:
+        """The snapshot in the Prometheus text format."""
+        data = self.snapshot(pools)
+        lines = []
+        for counter in ("checkouts", "checkins", "connects", "invalidations", "timeouts"):
+            lines += [f"# TYPE db_pool_{counter}_total counter", f"db_pool_{counter}_total {data[counter]}"]
+        for gauge in ("wait_seconds_avg", "wait_seconds_max"):
+            lines += [f"# TYPE db_pool_{gauge} gauge", f"db_pool_{gauge} {data[gauge]:g}"]
+        for gauge in ("size", "checkedin", "checkedout", "overflow"):
+            values = [(name, gauges[gauge]) for name, gauges in data["pools"].items() if gauge in gauges]
+            if values:
+                lines.append(f"# TYPE db_pool_{gauge} gauge")
+                lines += [f'db_pool_{gauge}{{pool="{name}"}} {value}' for name, value in values]
+        return lines
+
+
+def pool_gauges(pool: Pool) -> Dict[str, Any]:
+    gauges: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    # Only QueuePool-like pools track their size and overflow
+    for gauge in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, gauge, None)
+        if callable(method):
+            gauges[gauge] = method()
+    return gauges
+
+
+pool_metrics = PoolMetrics()
+
+
+class _InstrumentedPoolMixin:
+    """Times every wait for a connection and counts the ones that time out."""
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        finally:
+            pool_metrics.record_wait(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -1,13 +1,95 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
+from app.core.metrics import record_db_query
+from app.db.pool_metrics import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool, pool_metrics
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(url: str, asyncio: bool = False) -> Dict[str, Any]:
+    """Pool settings for `url`; SQLite keeps the pools SQLAlchemy picks for it."""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if asyncio else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+def instrument_queries(engine: Engine) -> None:
+    """Counts every statement and its time, failed ones too, in the metrics of the request that ran it."""
+    # The start time lives on the execution context of the statement, not on the pooled
+    # connection, so a statement that raises leaves nothing behind
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started_at = time.perf_counter()
+
+    def stop_query_timer(context) -> None:
+        started_at = getattr(context, "_query_started_at", None)
+        if started_at is not None:
+            del context._query_started_at
+            record_db_query(time.perf_counter() - started_at)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def stop_query_timer_after_execute(conn, cursor, statement, parameters, context, executemany):
+        stop_query_timer(context)
+
+    @event.listens_for(engine, "handle_error")
+    def stop_query_timer_on_error(exception_context):
+        stop_query_timer(exception_context.execution_context)
+
+@lru_cache
+def get_engine() -> Engine:
+    """
+    Builds the Engine on first use (normally in the app lifespan) instead of at import,
+    so importing the app loads no DB driver and forked workers never inherit a pool.
+    """
+    engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+    pool_metrics.attach(engine)
+    instrument_queries(engine)
+    return engine
+
+@lru_cache
+def get_sessionmaker() -> sessionmaker[Session]:
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
 
 def get_db():
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    """Builds the AsyncEngine on first use, so the async driver is only needed when ASYNC_DB is on."""
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        **engine_options(settings.ASYNC_DATABASE_URL, asyncio=True),
+    )
+    pool_metrics.attach(async_engine.sync_engine)
+    instrument_queries(async_engine.sync_engine)
+    return async_engine
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    # Attributes can't be lazily reloaded under asyncio, so keep them after commit
+    return async_sessionmaker(bind=get_async_engine(), autoflush=False, expire_on_commit=False)
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+async def dispose_engines() -> None:
+    """Closes the pooled connections of the engines created so far."""
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
@@ -1,11 +1,13 @@
 from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Callable
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 
-from app.repos.user import UserRepository
-from app.services.user import UserService
+from app.repos.token import AsyncRefreshTokenRepository, AsyncRevokedTokenRepository, RefreshTokenRepository, RevokedTokenRepository
+from app.repos.user import AsyncUserRepository, UserRepository
+from app.services.user import AsyncUserService, UserService
 
 def get_user_repository_dependency(db: Session = Depends(get_db)) -> UserRepository:
     """Dependência que fornece uma instância de UserRepository."""
@@ -17,3 +19,28 @@ def get_user_service_dependency(
     """Dependência que fornece uma instância de UserService com UserRepository injetado."""
     return UserService(user_repo)
 
+def get_async_user_repository_dependency(db: AsyncSession = Depends(get_async_db)) -> AsyncUserRepository:
+    """Dependência que fornece uma instância de AsyncUserRepository."""
+    return AsyncUserRepository(db)
+
+def get_async_user_service_dependency(
+    user_repo: AsyncUserRepository = Depends(get_async_user_repository_dependency),
+) -> AsyncUserService:
+    """Dependência que fornece uma instância de AsyncUserService com AsyncUserRepository injetado."""
+    return AsyncUserService(user_repo)
+
+def get_revoked_token_repository_dependency(db: Session = Depends(get_db)) -> RevokedTokenRepository:
+    """Dependência que fornece uma instância de RevokedTokenRepository."""
+    return RevokedTokenRepository(db)
+
+def get_async_revoked_token_repository_dependency(db: AsyncSession = Depends(get_async_db)) -> AsyncRevokedTokenRepository:
+    """Dependência que fornece uma instância de AsyncRevokedTokenRepository."""
+    return AsyncRevokedTokenRepository(db)
+
+def get_refresh_token_repository_dependency(db: Session = Depends(get_db)) -> RefreshTokenRepository:
+    """Dependência que fornece uma instância de RefreshTokenRepository."""
+    return RefreshTokenRepository(db)
+
+def get_async_refresh_token_repository_dependency(db: AsyncSession = Depends(get_async_db)) -> AsyncRefreshTokenRepository:
+    """Dependência que fornece uma instância de AsyncRefreshTokenRepository."""
+    return AsyncRefreshTokenRepository(db)
@@ -1,10 +1,73 @@
-from fastapi import FastAPI
-from app.api.api import api_router
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+from app.core.hashing import HashingPoolSaturated
 
-from app.routes.health import router as health_router
 
-app = FastAPI(title="Carteira Digital API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.core.hashing import password_hashing_pool
+    from app.core.revocation import refresh_revocation_list, run_revocation_sync
+    from app.db.session import dispose_engines, get_async_engine, get_engine
 
-app.include_router(api_router)
+    # Built here rather than at import so each (forked) worker creates its own
+    get_engine()
+    if settings.ASYNC_DB:
+        get_async_engine()
 
-app.include_router(health_router)
+    revocation_sync = None
+    if settings.REVOCATION_SYNC_SECONDS > 0:
+        await refresh_revocation_list()
+        revocation_sync = asyncio.create_task(run_revocation_sync(settings.REVOCATION_SYNC_SECONDS))
+    yield
+    if revocation_sync is not None:
+        revocation_sync.cancel()
+    password_hashing_pool.shutdown()
+    await dispose_engines()
+
+
+async def hashing_pool_saturated_handler(request: Request, exc: HashingPoolSaturated) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Password hashing service is busy, try again later"},
+        headers={"Retry-After": "1"},
+    )
+
+
+def create_app() -> FastAPI:
+    """
+    Builds the application. Routers and middlewares are imported here, and the engines
+    are created in the lifespan, so `uvicorn --factory app.main:create_app` works too.
+    """
+    from app.api.api import api_router
+    from app.core.compression import CompressionMiddleware
+    from app.core.metrics import MetricsMiddleware
+    from app.routes.health import router as health_router
+
+    app = FastAPI(title="Carteira Digital API", lifespan=lifespan)
+    app.add_exception_handler(HashingPoolSaturated, hashing_pool_saturated_handler)
+
+    if settings.COMPRESSION_ENABLED:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MIN_SIZE,
+            levels={
+                "gzip": settings.COMPRESSION_GZIP_LEVEL,
+                "br": settings.COMPRESSION_BROTLI_LEVEL,
+                "zstd": settings.COMPRESSION_ZSTD_LEVEL,
+            },
+        )
+
+    # Added last so it is the outermost layer and times compression too
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware, server_timing=settings.SERVER_TIMING_ENABLED)
+
+    app.include_router(api_router)
+
+    app.include_router(health_router)
+    return app
+
+
+app = create_app()
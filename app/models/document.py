@@ -1,8 +1,23 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 from app.models.user import User
 
+class DocumentBlob(Base):
+    """
+    A stored file, shared by every document with the same content. Uploads are keyed
+    by the SHA-256 of their bytes.
+    """
+    __tablename__ = "document_blobs"
+
+    storage_key = Column(String, primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<DocumentBlob(storage_key={self.storage_key}, size={self.size})>"
+
+
 class Document(Base):
     __tablename__ = "documents"
 
@@ -11,6 +26,10 @@ class Document(Base):
     file_url = Column(String, nullable=False)
     document_type = Column(String, nullable=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Set when the file itself is uploaded to the API (see app.storage and DocumentBlob)
+    storage_key = Column(String, ForeignKey("document_blobs.storage_key"), nullable=True, index=True)
+    content_type = Column(String, nullable=True)
+    size = Column(BigInteger, nullable=True)
     owner = relationship("User", back_populates="documents")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
@@ -19,5 +38,14 @@ class Document(Base):
         onupdate=func.now()
     )
 
+    # Every documents query filters by owner; these back the list (keyset on id) and
+    # the lookups by id, listings ordered by creation date and the collection version
+    # behind the list ETag (latest updated_at).
+    __table_args__ = (
+        Index("ix_documents_owner_id_id", "owner_id", "id"),
+        Index("ix_documents_owner_id_created_at", "owner_id", "created_at"),
+        Index("ix_documents_owner_id_updated_at", "owner_id", "updated_at"),
+    )
+
     def __repr__(self):
         return f"<Document(id={self.id}, title={self.title}, owner_id={self.owner_id})>"
@@ -0,0 +1,40 @@
+from sqlalchemy import Boolean, Column, Integer, String, ForeignKey, DateTime, func
+from app.db.base_class import Base
+
+
+class RevokedToken(Base):
+    """
+    Access token revoked before it expires, identified by its jti claim. Every sync of a
+    worker's RevocationList reads all the unexpired rows; expired ones are deleted.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String, unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<RevokedToken(jti={self.jti}, user_id={self.user_id})>"
+
+
+class RefreshToken(Base):
+    """
+    Refresh token, stored as the SHA-256 of its value. Every refresh uses the token up and
+    issues the next one of its family; a used token presented again must have leaked, so
+    the whole family is revoked.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(String, unique=True, nullable=False)
+    family_id = Column(String, nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    revoked = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<RefreshToken(id={self.id}, user_id={self.user_id}, family_id={self.family_id})>"
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Numeric, UniqueConstraint, func
+from app.db.base_class import Base
+
+
+class TransportBalance(Base):
+    """Materialized balance of a user's transport pass, kept in sync with the ledger."""
+    __tablename__ = "transport_balances"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    balance = Column(Numeric(12, 2, asdecimal=False), nullable=False, default=0)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now()
+    )
+
+    def __repr__(self):
+        return f"<TransportBalance(user_id={self.user_id}, balance={self.balance})>"
+
+
+class TransportLedgerEntry(Base):
+    """Append-only log of every transport balance change."""
+    __tablename__ = "transport_ledger"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    amount = Column(Numeric(12, 2, asdecimal=False), nullable=False)
+    balance_after = Column(Numeric(12, 2, asdecimal=False), nullable=False)
+    idempotency_key = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "idempotency_key", name="uq_transport_ledger_user_id_idempotency_key"),
+    )
+
+    def __repr__(self):
+        return f"<TransportLedgerEntry(id={self.id}, user_id={self.user_id}, amount={self.amount})>"
@@ -1,8 +1,59 @@
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Row, RowMapping
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Sequence
 
-from app.models.document import Document as DocumentModel
-from app.schemas.document import DocumentCreate
+from app.db.dialect import dialect_insert
+from app.models.document import Document as DocumentModel, DocumentBlob
+from app.schemas.document import DocumentCreate, StoredDocumentCreate, Document as DocumentSchema
+
+
+def _batch_insert(documents_data: List[DocumentCreate], owner_id: int):
+    """
+    Single INSERT ... RETURNING for many documents. RETURNING order is not guaranteed,
+    but ids are assigned in VALUES order, so callers sort the rows by id.
+    (sort_by_parameter_order would make SQLite fall back to one INSERT per row.)
+    """
+    # Core insert on the table: the ORM one splits the batch whenever a value is None
+    table = DocumentModel.__table__
+    stmt = insert(table).returning(*table.columns)
+    params = [
+        {
+            "title": document_data.title,
+            "file_url": document_data.file_url,
+            "document_type": document_data.document_type,
+            "owner_id": owner_id,
+        }
+        for document_data in documents_data
+    ]
+    return stmt, params
+
+# Only the columns of the response schema: list queries return plain row mappings,
+# without ORM instances, identity map or change tracking
+DOCUMENT_LIST_COLUMNS = tuple(DocumentModel.__table__.c[name] for name in DocumentSchema.model_fields)
+
+def _owner_documents(owner_id: int, after_id: Optional[int] = None):
+    query = select(*DOCUMENT_LIST_COLUMNS).where(DocumentModel.owner_id == owner_id)
+    if after_id is not None:
+        query = query.where(DocumentModel.id > after_id)
+    return query.order_by(DocumentModel.id)
+
+def _collection_version(owner_id: int):
+    return select(
+        func.count(DocumentModel.id).label("count"),
+        func.max(DocumentModel.id).label("last_id"),
+        func.max(DocumentModel.updated_at).label("last_updated_at"),
+    ).where(DocumentModel.owner_id == owner_id)
+
+def _stored_document(document_data: StoredDocumentCreate, owner_id: int) -> DocumentModel:
+    # file_url points at the download route, which needs the id: filled in after the flush
+    return DocumentModel(**document_data.model_dump(), file_url="", owner_id=owner_id)
+
+def _insert_blob(db, document_data: StoredDocumentCreate):
+    """Creates the blob of an upload unless a document with the same content already did."""
+    stmt = dialect_insert(db, DocumentBlob).values(storage_key=document_data.storage_key, size=document_data.size)
+    return stmt.on_conflict_do_nothing(index_elements=[DocumentBlob.storage_key])
 
 class DocumentRepository:
     def __init__(self, db: Session):
@@ -24,13 +75,152 @@ class DocumentRepository:
 
         return db_document
 
-    def get_documents_by_owner(self, owner_id: int) -> List[DocumentModel]:
-        """Retrieves all documents belonging to a specific user"""
-        return self.db.query(DocumentModel).filter(DocumentModel.owner_id == owner_id).all()
+    def create_documents(self, documents_data: List[DocumentCreate], owner_id: int) -> Sequence[Row]:
+        """
+        Creates many documents for a user in one transaction with a single INSERT ... RETURNING.
+        Returns plain rows, which stay readable after the commit without a refresh per document.
+        """
+        stmt, params = _batch_insert(documents_data, owner_id)
+        rows = sorted(self.db.execute(stmt, params).all(), key=lambda row: row.id)
+        self.db.commit()
+        return rows
+
+    def create_stored_document(self, document_data: StoredDocumentCreate, owner_id: int, file_url_for: Callable[[int], str]) -> DocumentModel:
+        """
+        Creates a document for an uploaded file and, if needed, its blob, in one
+        transaction. `file_url_for` builds the URL of the document from its new id.
+        """
+        self.db.execute(_insert_blob(self.db, document_data))
+        db_document = _stored_document(document_data, owner_id)
+        self.db.add(db_document)
+        self.db.flush()
+        db_document.file_url = file_url_for(db_document.id)
+        self.db.commit()
+        self.db.refresh(db_document)
+
+        return db_document
+
+    def has_blob(self, storage_key: str) -> bool:
+        """Whether a file with this key (its SHA-256) is already stored."""
+        return self.db.scalar(select(DocumentBlob.storage_key).where(DocumentBlob.storage_key == storage_key)) is not None
+
+    def get_collection_version(self, owner_id: int) -> Row:
+        """
+        Count, highest id and latest updated_at of a user's documents: any insert,
+        update or delete changes at least one of them.
+        """
+        return self.db.execute(_collection_version(owner_id)).one()
+
+    def get_documents_page_by_owner(self, owner_id: int, limit: int, after_id: Optional[int] = None) -> Sequence[RowMapping]:
+        """
+        Retrieves up to `limit` documents of a user ordered by id, starting after `after_id` (keyset pagination),
+        as read-only rows.
+        """
+        return self.db.execute(_owner_documents(owner_id, after_id).limit(limit)).mappings().all()
+
+    def iter_documents_by_owner(self, owner_id: int, after_id: Optional[int] = None, batch_size: int = 500) -> Iterator[RowMapping]:
+        """
+        Yields the documents of a user ordered by id as read-only rows, fetching `batch_size`
+        rows at a time through a server-side cursor instead of loading the whole result.
+        """
+        query = _owner_documents(owner_id, after_id).execution_options(yield_per=batch_size)
+
+        # FastAPI closes the request session before a streaming body is sent, so the
+        # session reopens a connection here and has to give it back once we are done.
+        try:
+            yield from self.db.execute(query).mappings()
+        finally:
+            self.db.close()
 
     def get_document_by_id_and_owner(self, document_id: int, owner_id: int) -> Optional[DocumentModel]:
         """Retrieves a document by ID, ensuring it belongs to the specified user."""
         return self.db.query(DocumentModel).filter(
             DocumentModel.id == document_id,
             DocumentModel.owner_id == owner_id
-        ).first()
\ No newline at end of file
+        ).first()
+
+
+class AsyncDocumentRepository:
+    """
+    AsyncSession counterpart of DocumentRepository, used when ASYNC_DB is enabled.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_document(self, document_data: DocumentCreate, owner_id: int) -> DocumentModel:
+        """Creates a new document in the database for a user."""
+        db_document = DocumentModel(
+            title=document_data.title,
+            file_url=document_data.file_url,
+            document_type=document_data.document_type,
+            owner_id=owner_id
+        )
+
+        self.db.add(db_document)
+        await self.db.commit()
+        await self.db.refresh(db_document)
+
+        return db_document
+
+    async def create_documents(self, documents_data: List[DocumentCreate], owner_id: int) -> Sequence[Row]:
+        """
+        Creates many documents for a user in one transaction with a single INSERT ... RETURNING.
+        """
+        stmt, params = _batch_insert(documents_data, owner_id)
+        rows = sorted((await self.db.execute(stmt, params)).all(), key=lambda row: row.id)
+        await self.db.commit()
+        return rows
+
+    async def create_stored_document(self, document_data: StoredDocumentCreate, owner_id: int, file_url_for: Callable[[int], str]) -> DocumentModel:
+        """
+        Creates a document for an uploaded file and, if needed, its blob, in one
+        transaction. `file_url_for` builds the URL of the document from its new id.
+        """
+        await self.db.execute(_insert_blob(self.db, document_data))
+        db_document = _stored_document(document_data, owner_id)
+        self.db.add(db_document)
+        await self.db.flush()
+        db_document.file_url = file_url_for(db_document.id)
+        await self.db.commit()
+        await self.db.refresh(db_document)
+
+        return db_document
+
+    async def has_blob(self, storage_key: str) -> bool:
+        """Whether a file with this key (its SHA-256) is already stored."""
+        return await self.db.scalar(select(DocumentBlob.storage_key).where(DocumentBlob.storage_key == storage_key)) is not None
+
+    async def get_collection_version(self, owner_id: int) -> Row:
+        """
+        Count, highest id and latest updated_at of a user's documents: any insert,
+        update or delete changes at least one of them.
+        """
+        return (await self.db.execute(_collection_version(owner_id))).one()
+
+    async def get_documents_page_by_owner(self, owner_id: int, limit: int, after_id: Optional[int] = None) -> Sequence[RowMapping]:
+        """
+        Retrieves up to `limit` documents of a user ordered by id, starting after `after_id` (keyset pagination),
+        as read-only rows.
+        """
+        return (await self.db.execute(_owner_documents(owner_id, after_id).limit(limit))).mappings().all()
+
+    async def iter_documents_by_owner(self, owner_id: int, after_id: Optional[int] = None, batch_size: int = 500) -> AsyncIterator[RowMapping]:
+        """
+        Yields the documents of a user ordered by id as read-only rows, fetching `batch_size`
+        rows at a time through a server-side cursor instead of loading the whole result.
+        """
+        query = _owner_documents(owner_id, after_id).execution_options(yield_per=batch_size)
+
+        # Same as the sync repository: the request session is already closed when the body streams
+        try:
+            async for row in (await self.db.stream(query)).mappings():
+                yield row
+        finally:
+            await self.db.close()
+
+    async def get_document_by_id_and_owner(self, document_id: int, owner_id: int) -> Optional[DocumentModel]:
+        """Retrieves a document by ID, ensuring it belongs to the specified user."""
+        return await self.db.scalar(select(DocumentModel).where(
+            DocumentModel.id == document_id,
+            DocumentModel.owner_id == owner_id
+        ))
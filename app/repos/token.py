@@ -0,0 +1,127 @@
+from datetime import datetime
+from sqlalchemy import delete, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Optional, Sequence
+
+from app.db.dialect import dialect_insert
+from app.models.token import RefreshToken, RevokedToken
+
+
+def _revoke(db, jti: str, user_id: Optional[int], expires_at: datetime):
+    # Revoking the same token twice (e.g. a retried logout) is not an error
+    stmt = dialect_insert(db, RevokedToken).values(jti=jti, user_id=user_id, expires_at=expires_at)
+    return stmt.on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+
+
+def _use_refresh_token(token_hash: str, now: datetime):
+    # A single UPDATE, so two concurrent refreshes with the same token can't both succeed
+    return (
+        update(RefreshToken)
+        .where(
+            RefreshToken.token_hash == token_hash,
+            RefreshToken.used_at.is_(None),
+            RefreshToken.revoked.is_(False),
+            RefreshToken.expires_at > now,
+        )
+        .values(used_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+        .execution_options(synchronize_session=False)
+    )
+
+def _revoke_family_of_used(token_hash: str):
+    used_family = select(RefreshToken.family_id).where(
+        RefreshToken.token_hash == token_hash, RefreshToken.used_at.is_not(None)
+    ).scalar_subquery()
+    return (
+        update(RefreshToken)
+        .where(RefreshToken.family_id == used_family)
+        .values(revoked=True)
+        .execution_options(synchronize_session=False)
+    )
+
+
+class RevokedTokenRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def revoke(self, jti: str, user_id: Optional[int], expires_at: datetime) -> None:
+        """Records a token as revoked until `expires_at`."""
+        self.db.execute(_revoke(self.db, jti, user_id, expires_at))
+        self.db.commit()
+
+    def get_unexpired(self, now: datetime) -> Sequence[Row]:
+        """Every revoked token that has not expired yet (jti and expires_at)."""
+        return self.db.execute(
+            select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+        ).all()
+
+    def delete_expired(self, now: datetime) -> None:
+        """Deletes the revocations of tokens that expired: they are rejected anyway."""
+        self.db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+        self.db.commit()
+
+
+class AsyncRevokedTokenRepository:
+    """
+    AsyncSession counterpart of RevokedTokenRepository for the async auth routes.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def revoke(self, jti: str, user_id: Optional[int], expires_at: datetime) -> None:
+        """Records a token as revoked until `expires_at`."""
+        await self.db.execute(_revoke(self.db, jti, user_id, expires_at))
+        await self.db.commit()
+
+
+class RefreshTokenRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, token_hash: str, family_id: str, user_id: int, expires_at: datetime) -> None:
+        """Stores a new refresh token of a family."""
+        self.db.add(RefreshToken(token_hash=token_hash, family_id=family_id, user_id=user_id, expires_at=expires_at))
+        self.db.commit()
+
+    def use(self, token_hash: str, now: datetime) -> Optional[Row]:
+        """
+        Marks a valid, unused refresh token as used and returns its user_id and family_id;
+        None when the token is unknown, expired, revoked or already used. Not committed:
+        create() of the next token of the family commits both.
+        """
+        return self.db.execute(_use_refresh_token(token_hash, now)).first()
+
+    def revoke_family_if_used(self, token_hash: str) -> bool:
+        """Revokes every token of the family of `token_hash` if that token was already used."""
+        revoked = self.db.execute(_revoke_family_of_used(token_hash)).rowcount > 0
+        self.db.commit()
+        return revoked
+
+
+class AsyncRefreshTokenRepository:
+    """
+    AsyncSession counterpart of RefreshTokenRepository for the async auth routes.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, token_hash: str, family_id: str, user_id: int, expires_at: datetime) -> None:
+        """Stores a new refresh token of a family."""
+        self.db.add(RefreshToken(token_hash=token_hash, family_id=family_id, user_id=user_id, expires_at=expires_at))
+        await self.db.commit()
+
+    async def use(self, token_hash: str, now: datetime) -> Optional[Row]:
+        """
+        Marks a valid, unused refresh token as used and returns its user_id and family_id;
+        None when the token is unknown, expired, revoked or already used. Not committed:
+        create() of the next token of the family commits both.
+        """
+        return (await self.db.execute(_use_refresh_token(token_hash, now))).first()
+
+    async def revoke_family_if_used(self, token_hash: str) -> bool:
+        """Revokes every token of the family of `token_hash` if that token was already used."""
+        revoked = (await self.db.execute(_revoke_family_of_used(token_hash))).rowcount > 0
+        await self.db.commit()
+        return revoked
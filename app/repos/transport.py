@@ -0,0 +1,109 @@
+from collections import defaultdict
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.db.dialect import dialect_insert
+from app.models.transport import TransportBalance, TransportLedgerEntry
+from app.models.user import User as UserModel
+
+
+def _cents(value: float) -> float:
+    # Balances are stored as Numeric(12, 2): float sums are brought back to that precision
+    return round(value, 2)
+
+class TransportRepository:
+    """
+    Repository for the transport ledger and the materialized balances.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_balance(self, user_id: int) -> float:
+        """Returns the current balance of a user (0.0 if they never recharged)."""
+        balance = self.db.scalar(select(TransportBalance.balance).where(TransportBalance.user_id == user_id))
+        return balance or 0.0
+
+    def get_entry_by_idempotency_key(self, user_id: int, idempotency_key: str) -> Optional[TransportLedgerEntry]:
+        return self.db.scalar(select(TransportLedgerEntry).where(
+            TransportLedgerEntry.user_id == user_id,
+            TransportLedgerEntry.idempotency_key == idempotency_key
+        ))
+
+    def recharge(self, user_id: int, amount: float, idempotency_key: Optional[str] = None) -> TransportLedgerEntry:
+        """
+        Adds `amount` to the balance and appends the ledger entry in one transaction.
+        The balance is incremented by a single upsert, so concurrent recharges never lose updates.
+        A repeated `idempotency_key` returns the entry of the first request instead.
+        """
+        if idempotency_key is not None:
+            existing = self.get_entry_by_idempotency_key(user_id, idempotency_key)
+            if existing is not None:
+                return existing
+
+        stmt = dialect_insert(self.db, TransportBalance).values(user_id=user_id, balance=amount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TransportBalance.user_id],
+            set_={"balance": TransportBalance.balance + stmt.excluded.balance, "updated_at": func.now()},
+        ).returning(TransportBalance.balance)
+        new_balance = _cents(self.db.execute(stmt).scalar_one())
+
+        entry = TransportLedgerEntry(
+            user_id=user_id,
+            amount=amount,
+            balance_after=new_balance,
+            idempotency_key=idempotency_key,
+        )
+        self.db.add(entry)
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent request with the same key committed first: undo our increment
+            self.db.rollback()
+            existing = self.get_entry_by_idempotency_key(user_id, idempotency_key) if idempotency_key else None
+            if existing is None:
+                raise
+            return existing
+
+        return entry
+
+    def get_existing_user_ids(self, user_ids: Iterable[int]) -> Set[int]:
+        return set(self.db.scalars(select(UserModel.id).where(UserModel.id.in_(set(user_ids)))))
+
+    def recharge_many(self, items: List[Tuple[int, float]]) -> List[float]:
+        """
+        Applies a list of (user_id, amount) recharges, amounts in cents precision, in one
+        transaction: one multi-row upsert for the balances and one batched insert for the ledger.
+        Returns the balance after each item, in the order of `items`.
+        """
+        # A single upsert cannot touch the same row twice, so repeated users are summed first
+        totals: Dict[int, float] = defaultdict(float)
+        for user_id, amount in items:
+            totals[user_id] = _cents(totals[user_id] + amount)
+
+        # Rows in user_id order: batches with overlapping users then lock the balances in
+        # the same order and can't deadlock each other
+        stmt = dialect_insert(self.db, TransportBalance).values(
+            [{"user_id": user_id, "balance": total} for user_id, total in sorted(totals.items())]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[TransportBalance.user_id],
+            set_={"balance": TransportBalance.balance + stmt.excluded.balance, "updated_at": func.now()},
+        ).returning(TransportBalance.user_id, TransportBalance.balance)
+        final_balances = dict(self.db.execute(stmt).all())
+
+        # Replay the items on top of the balance each user had before the batch
+        running = {user_id: _cents(final_balances[user_id] - total) for user_id, total in totals.items()}
+        balances_after = []
+        for user_id, amount in items:
+            running[user_id] = _cents(running[user_id] + amount)
+            balances_after.append(running[user_id])
+
+        self.db.execute(insert(TransportLedgerEntry), [
+            {"user_id": user_id, "amount": amount, "balance_after": balance_after}
+            for (user_id, amount), balance_after in zip(items, balances_after)
+        ])
+        self.db.commit()
+
+        return balances_after
@@ -1,6 +1,10 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.core.hashing import UNUSABLE_PASSWORD
+from app.db.dialect import dialect_insert
 from app.models.user import User as UserModel
 from app.schemas.user import UserCreate
 
@@ -33,25 +37,82 @@ class UserRepository:
 
         return db_user
 
-    def find_or_create_oauth_user(self, email: str, full_name: Optional[str] = None, hashed_placeholder_password: str = "placeholder") -> UserModel:
+    def find_or_create_oauth_user(self, email: str, full_name: Optional[str] = None) -> UserModel:
         """
         Finds a user by email or creates a new one for OAuth login.
-        Note: The placeholder password hash should be generated BEFORE calling this method.
+        The user gets an unusable password, so they can only log in through OAuth.
         """
         user = self.get_by_email(email)
+        if user is not None:
+            return user
+
+        # ON CONFLICT keeps concurrent first logins of the same email from failing
+        stmt = dialect_insert(self.db, UserModel).values(
+            email=email,
+            hashed_password=UNUSABLE_PASSWORD,
+            full_name=full_name,
+            is_active=True,
+            is_superuser=False,
+        ).on_conflict_do_nothing(index_elements=[UserModel.email]).returning(UserModel)
+
+        user = self.db.scalars(stmt).first()
+        self.db.commit()
 
         if user is None:
-            # User doesn't exist, create a new one
-            db_user = UserModel(
-                email=email,
-                hashed_password=hashed_placeholder_password,
-                full_name=full_name,
-                is_active=True,
-                is_superuser=False,
-            )
-            self.db.add(db_user)
-            self.db.commit()
-            self.db.refresh(db_user)
-            user = db_user
+            # Another request created the user between our lookup and the insert
+            user = self.get_by_email(email)
+        return user
+
+
+class AsyncUserRepository:
+    """
+    AsyncSession counterpart of UserRepository, used when ASYNC_DB is enabled.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_email(self, email: str) -> UserModel | None:
+        """Finds a user by email."""
+        return await self.db.scalar(select(UserModel).where(UserModel.email == email))
+
+    async def get_by_id(self, user_id: int) -> UserModel | None:
+        """Finds a user by ID."""
+        return await self.db.get(UserModel, user_id)
 
+    async def create(self, user_data: UserCreate, hashed_password: str) -> UserModel:
+        """Creates a new user in the database."""
+        db_user = UserModel(
+            email=user_data.email,
+            hashed_password=hashed_password,
+            full_name=user_data.full_name,
+        )
+
+        self.db.add(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
+
+        return db_user
+
+    async def find_or_create_oauth_user(self, email: str, full_name: Optional[str] = None) -> UserModel:
+        """
+        Finds a user by email or creates a new one for OAuth login.
+        The user gets an unusable password, so they can only log in through OAuth.
+        """
+        user = await self.get_by_email(email)
+        if user is not None:
+            return user
+
+        stmt = dialect_insert(self.db, UserModel).values(
+            email=email,
+            hashed_password=UNUSABLE_PASSWORD,
+            full_name=full_name,
+            is_active=True,
+            is_superuser=False,
+        ).on_conflict_do_nothing(index_elements=[UserModel.email]).returning(UserModel)
+
+        user = (await self.db.scalars(stmt)).first()
+        await self.db.commit()
+
+        if user is None:
+            user = await self.get_by_email(email)
         return user
@@ -1,11 +1,76 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, status
 from sqlalchemy.orm import Session
-from app.schemas.user import Token, LoginRequest
-from app.services.auth import login_user
+from app.core.security import get_current_user, get_current_user_async, oauth2_scheme
+from app.repos.token import AsyncRefreshTokenRepository, AsyncRevokedTokenRepository, RefreshTokenRepository, RevokedTokenRepository
+from app.schemas.user import Token, LoginRequest, RefreshRequest, User as UserSchema
+from app.services.auth import (
+    async_login_user,
+    async_refresh_tokens,
+    async_revoke_access_token,
+    login_user,
+    refresh_tokens,
+    revoke_access_token,
+)
+from app.services.user import AsyncUserService, UserService
 from app.db.session import get_db
+from app.dependencies import (
+    get_async_refresh_token_repository_dependency,
+    get_async_revoked_token_repository_dependency,
+    get_async_user_service_dependency,
+    get_refresh_token_repository_dependency,
+    get_revoked_token_repository_dependency,
+    get_user_service_dependency,
+)
 
 router = APIRouter()
 
 @router.post("/login", response_model=Token)
-def login(data: LoginRequest, db: Session = Depends(get_db)):
-    return login_user(data.email, data.password, db)
\ No newline at end of file
+async def login(data: LoginRequest, db: Session = Depends(get_db)):
+    return await login_user(data.email, data.password, db)
+
+@router.post("/refresh", response_model=Token)
+def refresh(
+    data: RefreshRequest,
+    refresh_token_repo: RefreshTokenRepository = Depends(get_refresh_token_repository_dependency),
+    user_service: UserService = Depends(get_user_service_dependency),
+):
+    """Exchanges a refresh token for a new access token and refresh token."""
+    return refresh_tokens(data.refresh_token, refresh_token_repo, user_service)
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    token: str = Depends(oauth2_scheme),
+    current_user: UserSchema = Depends(get_current_user),
+    revoked_token_repo: RevokedTokenRepository = Depends(get_revoked_token_repository_dependency),
+):
+    """Revokes the access token of the request."""
+    revoke_access_token(token, revoked_token_repo)
+
+
+async_router = APIRouter()
+
+@async_router.post("/login", response_model=Token)
+async def login_async(
+    data: LoginRequest,
+    user_service: AsyncUserService = Depends(get_async_user_service_dependency),
+    refresh_token_repo: AsyncRefreshTokenRepository = Depends(get_async_refresh_token_repository_dependency),
+):
+    return await async_login_user(data.email, data.password, user_service, refresh_token_repo)
+
+@async_router.post("/refresh", response_model=Token)
+async def refresh_async(
+    data: RefreshRequest,
+    refresh_token_repo: AsyncRefreshTokenRepository = Depends(get_async_refresh_token_repository_dependency),
+    user_service: AsyncUserService = Depends(get_async_user_service_dependency),
+):
+    """Exchanges a refresh token for a new access token and refresh token."""
+    return await async_refresh_tokens(data.refresh_token, refresh_token_repo, user_service)
+
+@async_router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_async(
+    token: str = Depends(oauth2_scheme),
+    current_user: UserSchema = Depends(get_current_user_async),
+    revoked_token_repo: AsyncRevokedTokenRepository = Depends(get_async_revoked_token_repository_dependency),
+):
+    """Revokes the access token of the request."""
+    await async_revoke_access_token(token, revoked_token_repo)
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, status
+from functools import lru_cache
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, status
+from pydantic import ValidationError
+from app.core.cache import build_shared_cache
+from app.core.config import settings
 from app.schemas.chatbot import ChatbotRequest, ChatbotResponse
 from app.services.chatbot import ChatbotService
 
 router = APIRouter(tags=["Chatbot"])
 
 
+@lru_cache
 def get_chatbot_service() -> ChatbotService:
-    return ChatbotService()
+    """Process-wide ChatbotService, so its answer cache is shared by every request."""
+    return ChatbotService(shared_cache=build_shared_cache(settings.CHATBOT_SHARED_CACHE_BACKEND))
 
 @router.post("/", response_model=ChatbotResponse)
 def ask_chatbot(
@@ -18,3 +24,28 @@ def ask_chatbot(
     """
     answer = chatbot_service.get_chatbot_response(query.question)
     return {"answer": answer}
+
+
+@router.websocket("/ws")
+async def chatbot_websocket(
+    websocket: WebSocket,
+    chatbot_service: ChatbotService = Depends(get_chatbot_service)
+):
+    """
+    Multi-turn chatbot session over a single connection, so the handshake is paid once per
+    conversation. Each {"question": ...} message is answered with an `answer` message.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                query = ChatbotRequest.model_validate(await websocket.receive_json())
+            # KeyError: a binary frame, which receive_json can't read as text
+            except (ValidationError, ValueError, KeyError):
+                await websocket.send_json({"type": "error", "detail": "Expected a JSON object with a 'question' field"})
+                continue
+
+            answer = chatbot_service.get_chatbot_response(query.question)
+            await websocket.send_json({"type": "answer", "answer": answer})
+    except WebSocketDisconnect:
+        pass
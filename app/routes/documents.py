@@ -1,23 +1,75 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+import os
+from functools import lru_cache
+from fastapi import APIRouter, Depends, Header, Query, Request, Response, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app.schemas.document import DocumentCreate, Document as DocumentResponseSchema
+from app.schemas.document import DocumentBatchCreate, DocumentCreate, DocumentFile, Document as DocumentResponseSchema
 from app.schemas.user import User as UserSchema
-from app.services.document import DocumentService
-from app.repos.document import DocumentRepository
+from app.services.document import AsyncDocumentService, DocumentService, parse_byte_range
+from app.repos.document import AsyncDocumentRepository, DocumentRepository
 
-from app.db.session import get_db
-from app.core.security import get_current_user
+from app.db.session import get_async_db, get_db
+from app.core.conditional import ConditionalRequest, get_conditional_request, not_modified_response
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.core.security import get_current_user, get_current_user_async
+from app.storage import StorageBackend, build_storage
 
 
 router = APIRouter(tags=["Documents"])
 
+@lru_cache
+def get_storage() -> StorageBackend:
+    """Process-wide storage backend of the document files."""
+    return build_storage(
+        settings.STORAGE_BACKEND, settings.STORAGE_LOCAL_ROOT, settings.STORAGE_BUCKET, settings.STORAGE_S3_ENDPOINT_URL
+    )
+
 def get_document_repo(db: Session = Depends(get_db)) -> DocumentRepository:
     return DocumentRepository(db)
 
-def get_document_service(document_repo: DocumentRepository = Depends(get_document_repo)) -> DocumentService:
-    return DocumentService(document_repo)
+def get_document_service(
+    document_repo: DocumentRepository = Depends(get_document_repo),
+    storage: StorageBackend = Depends(get_storage)
+) -> DocumentService:
+    return DocumentService(document_repo, storage)
+
+
+# The file is the raw request body (any Content-Type), read chunk by chunk as it arrives
+UPLOAD_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+    }
+}
+
+def file_response(storage: StorageBackend, document_file: DocumentFile, range_header: Optional[str]) -> Response:
+    """
+    Streams the file of a document, honouring a Range header. Files on the local disk
+    go through FileResponse; the others are read from the storage in chunks.
+    """
+    path = storage.local_path(document_file.storage_key)
+    if path is not None:
+        if not os.path.isfile(path):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document file not found")
+        return FileResponse(path, media_type=document_file.content_type, content_disposition_type="inline")
+
+    size = document_file.size
+    byte_range = parse_byte_range(range_header, size)
+    start, end = byte_range or (0, size - 1)
+    headers = {"Accept-Ranges": "bytes", "Content-Length": str(end - start + 1)}
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return StreamingResponse(
+        storage.iter_range(document_file.storage_key, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT if byte_range else status.HTTP_200_OK,
+        media_type=document_file.content_type,
+        headers=headers,
+    )
 
 
 @router.post("/", response_model=DocumentResponseSchema, status_code=status.HTTP_201_CREATED)
@@ -32,26 +84,207 @@ def create_document_for_current_user(
     new_document = document_service.create_document_for_user(document_data, current_user)
     return new_document
 
+@router.post("/batch", response_model=List[DocumentResponseSchema], status_code=status.HTTP_201_CREATED)
+def create_documents_batch_for_current_user(
+    documents_data: DocumentBatchCreate,
+    current_user: UserSchema = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    """
+    Stores many digital documents for the authenticated user in a single transaction.
+    """
+    documents = document_service.create_documents_for_user(documents_data, current_user)
+    return FastJSONResponse(documents, status_code=status.HTTP_201_CREATED)
+
+@router.post("/upload", response_model=DocumentResponseSchema, status_code=status.HTTP_201_CREATED, openapi_extra=UPLOAD_OPENAPI)
+async def upload_document_for_current_user(
+    request: Request,
+    title: str = Query(..., min_length=1),
+    document_type: Optional[str] = Query(None),
+    content_type: str = Header("application/octet-stream"),
+    x_content_sha256: Optional[str] = Header(None, pattern="^[0-9a-fA-F]{64}$", description="SHA-256 of the file, lets the API skip storing a file it already has."),
+    current_user: UserSchema = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    """
+    Uploads a file (the raw request body, plain or chunked) and stores it as a new
+    document of the authenticated user. The body is streamed to the storage, never
+    held in memory as a whole, and identical files are stored only once.
+    """
+    return await document_service.upload_document_for_user(
+        title, document_type, content_type, request.stream(), current_user,
+        x_content_sha256.lower() if x_content_sha256 else None
+    )
+
 @router.get("/", response_model=List[DocumentResponseSchema])
 def list_documents_for_current_user(
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of documents in the page."),
+    cursor: Optional[str] = Query(None, description="Cursor returned in the X-Next-Cursor header of the previous page."),
+    stream: bool = Query(False, description="Stream every document as NDJSON instead of returning a single page."),
+    conditions: ConditionalRequest = Depends(get_conditional_request),
     current_user: UserSchema = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service)
 ):
     """
-    Lists all digital documents for the authenticated user.
+    Lists the digital documents for the authenticated user, one page at a time.
+    The cursor of the next page is sent in the X-Next-Cursor header. Pages carry an
+    ETag and Last-Modified; a conditional GET of an unchanged page gets 304.
     """
-    documents = document_service.get_documents_by_user(current_user)
-    return documents
+    if stream:
+        return StreamingResponse(
+            document_service.stream_documents_by_user(current_user, cursor),
+            media_type="application/x-ndjson",
+        )
+
+    documents, next_cursor, validators = document_service.get_documents_page_by_user(current_user, limit, cursor, conditions)
+    if documents is None:
+        return not_modified_response(validators)
+    headers = validators.headers()
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    # The service returns validated schemas: no second validation against response_model
+    return FastJSONResponse(documents, headers=headers)
 
 
 @router.get("/{document_id}", response_model=DocumentResponseSchema)
 def get_document_by_id(
     document_id: int,
+    response: Response,
+    conditions: ConditionalRequest = Depends(get_conditional_request),
     current_user: UserSchema = Depends(get_current_user),
     document_service: DocumentService = Depends(get_document_service)
 ):
     """
     Gets a specific digital document for the authenticated user by ID.
+    Answers 304 to a conditional GET when the document did not change.
+    """
+    document, validators = document_service.get_user_document_by_id(document_id, current_user, conditions)
+    if document is None:
+        return not_modified_response(validators)
+    response.headers.update(validators.headers())
+    return document
+
+@router.get("/{document_id}/content")
+async def download_document_content(
+    document_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user: UserSchema = Depends(get_current_user),
+    document_service: DocumentService = Depends(get_document_service)
+):
+    """
+    Downloads the file of a document of the authenticated user (supports Range requests).
+    """
+    document_file = await run_in_threadpool(document_service.get_user_document_file, document_id, current_user)
+    return file_response(document_service.storage, document_file, range_header)
+
+
+async_router = APIRouter(tags=["Documents"])
+
+def get_async_document_service(
+    db: AsyncSession = Depends(get_async_db),
+    storage: StorageBackend = Depends(get_storage)
+) -> AsyncDocumentService:
+    return AsyncDocumentService(AsyncDocumentRepository(db), storage)
+
+
+@async_router.post("/", response_model=DocumentResponseSchema, status_code=status.HTTP_201_CREATED)
+async def create_document_for_current_user_async(
+    document_data: DocumentCreate,
+    current_user: UserSchema = Depends(get_current_user_async),
+    document_service: AsyncDocumentService = Depends(get_async_document_service)
+):
+    """
+    Stores a new digital document for the authenticated user.
+    """
+    return await document_service.create_document_for_user(document_data, current_user)
+
+@async_router.post("/batch", response_model=List[DocumentResponseSchema], status_code=status.HTTP_201_CREATED)
+async def create_documents_batch_for_current_user_async(
+    documents_data: DocumentBatchCreate,
+    current_user: UserSchema = Depends(get_current_user_async),
+    document_service: AsyncDocumentService = Depends(get_async_document_service)
+):
+    """
+    Stores many digital documents for the authenticated user in a single transaction.
+    """
+    documents = await document_service.create_documents_for_user(documents_data, current_user)
+    return FastJSONResponse(documents, status_code=status.HTTP_201_CREATED)
+
+@async_router.post("/upload", response_model=DocumentResponseSchema, status_code=status.HTTP_201_CREATED, openapi_extra=UPLOAD_OPENAPI)
+async def upload_document_for_current_user_async(
+    request: Request,
+    title: str = Query(..., min_length=1),
+    document_type: Optional[str] = Query(None),
+    content_type: str = Header("application/octet-stream"),
+    x_content_sha256: Optional[str] = Header(None, pattern="^[0-9a-fA-F]{64}$", description="SHA-256 of the file, lets the API skip storing a file it already has."),
+    current_user: UserSchema = Depends(get_current_user_async),
+    document_service: AsyncDocumentService = Depends(get_async_document_service)
+):
+    """
+    Uploads a file (the raw request body, plain or chunked) and stores it as a new
+    document of the authenticated user.
+    """
+    return await document_service.upload_document_for_user(
+        title, document_type, content_type, request.stream(), current_user,
+        x_content_sha256.lower() if x_content_sha256 else None
+    )
+
+@async_router.get("/", response_model=List[DocumentResponseSchema])
+async def list_documents_for_current_user_async(
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of documents in the page."),
+    cursor: Optional[str] = Query(None, description="Cursor returned in the X-Next-Cursor header of the previous page."),
+    stream: bool = Query(False, description="Stream every document as NDJSON instead of returning a single page."),
+    conditions: ConditionalRequest = Depends(get_conditional_request),
+    current_user: UserSchema = Depends(get_current_user_async),
+    document_service: AsyncDocumentService = Depends(get_async_document_service)
+):
+    """
+    Lists the digital documents for the authenticated user, one page at a time.
+    The cursor of the next page is sent in the X-Next-Cursor header. Pages carry an
+    ETag and Last-Modified; a conditional GET of an unchanged page gets 304.
+    """
+    if stream:
+        return StreamingResponse(
+            document_service.stream_documents_by_user(current_user, cursor),
+            media_type="application/x-ndjson",
+        )
+
+    documents, next_cursor, validators = await document_service.get_documents_page_by_user(current_user, limit, cursor, conditions)
+    if documents is None:
+        return not_modified_response(validators)
+    headers = validators.headers()
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    # The service returns validated schemas: no second validation against response_model
+    return FastJSONResponse(documents, headers=headers)
+
+@async_router.get("/{document_id}", response_model=DocumentResponseSchema)
+async def get_document_by_id_async(
+    document_id: int,
+    response: Response,
+    conditions: ConditionalRequest = Depends(get_conditional_request),
+    current_user: UserSchema = Depends(get_current_user_async),
+    document_service: AsyncDocumentService = Depends(get_async_document_service)
+):
+    """
+    Gets a specific digital document for the authenticated user by ID.
+    Answers 304 to a conditional GET when the document did not change.
     """
-    document = document_service.get_user_document_by_id(document_id, current_user)
+    document, validators = await document_service.get_user_document_by_id(document_id, current_user, conditions)
+    if document is None:
+        return not_modified_response(validators)
+    response.headers.update(validators.headers())
     return document
+
+@async_router.get("/{document_id}/content")
+async def download_document_content_async(
+    document_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
+    current_user: UserSchema = Depends(get_current_user_async),
+    document_service: AsyncDocumentService = Depends(get_async_document_service)
+):
+    """
+    Downloads the file of a document of the authenticated user (supports Range requests).
+    """
+    document_file = await document_service.get_user_document_file(document_id, current_user)
+    return file_response(document_service.storage, document_file, range_header)
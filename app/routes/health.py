@@ -1,8 +1,59 @@
 
-from fastapi import APIRouter
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import request_metrics
+from app.core.security import get_current_user
+from app.db.pool_metrics import pool_metrics
+from app.db.session import get_async_engine, get_engine
+from app.schemas.user import User as UserSchema
 
 router = APIRouter()
 
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
+
+def _pools():
+    pools = {"sync": get_engine().pool}
+    if settings.ASYNC_DB:
+        pools["async"] = get_async_engine().sync_engine.pool
+    return pools
+
+@router.get("/health/pool")
+def pool_health(current_user: UserSchema = Depends(get_current_user)):
+    """
+    Connection pool statistics: checkouts, wait time, overflow and timeouts.
+    Only for administrators; /health is the anonymous probe.
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    return pool_metrics.snapshot(_pools())
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """Lets through the scraper holding METRICS_TOKEN; without one configured /metrics is not exposed."""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}"
+    if authorization is None or not secrets.compare_digest(authorization.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+def metrics():
+    """
+    Request latency, DB queries and auth time per route plus the pool statistics,
+    in the Prometheus text format.
+    """
+    lines = request_metrics.render() + pool_metrics.prometheus_lines(_pools())
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
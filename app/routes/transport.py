@@ -1,15 +1,22 @@
-from fastapi import APIRouter, Depends, status
-from app.schemas.transport import BalanceResponse, RechargeRequest
+from fastapi import APIRouter, Depends, Header, status
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.schemas.transport import BalanceResponse, BatchRechargeRequest, BatchRechargeResponse, RechargeRequest
 from app.schemas.user import User as UserSchema
 from app.services.transport import TransportService
+from app.repos.transport import TransportRepository
+from app.db.session import get_db
 from app.core.security import get_current_user 
 
 
 router = APIRouter(tags=["Transport"])
 
 
-def get_transport_service() -> TransportService:
-    return TransportService()
+def get_transport_repo(db: Session = Depends(get_db)) -> TransportRepository:
+    return TransportRepository(db)
+
+def get_transport_service(transport_repo: TransportRepository = Depends(get_transport_repo)) -> TransportService:
+    return TransportService(transport_repo)
 
 @router.get("/balance/", response_model=BalanceResponse)
 def get_transport_balance(
@@ -17,7 +24,7 @@ def get_transport_balance(
     transport_service: TransportService = Depends(get_transport_service)
 ):
     """
-    Endpoint to query the authenticated user's transport pass balance (mocked).
+    Endpoint to query the authenticated user's transport pass balance.
     """
     balance = transport_service.get_balance(current_user)
     return {"balance": balance}
@@ -25,11 +32,26 @@ def get_transport_balance(
 @router.post("/recharge/", response_model=BalanceResponse)
 def recharge_transport_balance(
     recharge_data: RechargeRequest,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     current_user: UserSchema = Depends(get_current_user),
     transport_service: TransportService = Depends(get_transport_service)
 ):
     """
-    Endpoint to simulate topping up the authenticated user's transport pass.
+    Endpoint to top up the authenticated user's transport pass.
+    Retries carrying the same Idempotency-Key are applied only once.
     """
-    new_balance = transport_service.recharge_balance(current_user, recharge_data.amount)
+    new_balance = transport_service.recharge_balance(current_user, recharge_data.amount, idempotency_key)
     return {"balance": new_balance}
+
+@router.post("/recharge/batch", response_model=BatchRechargeResponse)
+def recharge_transport_balance_batch(
+    batch_data: BatchRechargeRequest,
+    current_user: UserSchema = Depends(get_current_user),
+    transport_service: TransportService = Depends(get_transport_service)
+):
+    """
+    Endpoint for administrators to top up many transport passes in a single transaction.
+    Returns the outcome of every item.
+    """
+    results = transport_service.recharge_batch(current_user, batch_data.items)
+    return {"results": results}
@@ -3,16 +3,28 @@ from sqlalchemy.orm import Session
 
 from app.schemas.user import UserCreate, User as UserResponseSchema
 
-from app.dependencies import get_user_service_dependency
-from app.services.user import UserService
+from app.dependencies import get_async_user_service_dependency, get_user_service_dependency
+from app.services.user import AsyncUserService, UserService
 
 router = APIRouter(tags=["Users"])
 
 
 @router.post("/", response_model=UserResponseSchema, status_code=status.HTTP_201_CREATED)
-def create_new_user(
+async def create_new_user(
     user_data: UserCreate,
     user_service: UserService = Depends(get_user_service_dependency)
 ):
-    new_user = user_service.create_user(user_data)
+    new_user = await user_service.create_user(user_data)
+    return new_user
+
+
+async_router = APIRouter(tags=["Users"])
+
+
+@async_router.post("/", response_model=UserResponseSchema, status_code=status.HTTP_201_CREATED)
+async def create_new_user_async(
+    user_data: UserCreate,
+    user_service: AsyncUserService = Depends(get_async_user_service_dependency)
+):
+    new_user = await user_service.create_user(user_data)
     return new_user
@@ -1,19 +1,42 @@
-from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, List, Optional
 from datetime import datetime
 
+MAX_DOCUMENTS_PER_BATCH = 500
+
 class DocumentCreate(BaseModel):
     title: str
     file_url: str
     document_type: Optional[str] = None
 
 
+class StoredDocumentCreate(BaseModel):
+    """A document whose file was uploaded to the storage backend."""
+    title: str
+    document_type: Optional[str] = None
+    storage_key: str
+    content_type: str
+    size: int
+
+
+class DocumentFile(BaseModel):
+    """Where the file of a document is stored, for downloads."""
+    storage_key: str
+    content_type: str
+    size: int
+
+
+DocumentBatchCreate = Annotated[List[DocumentCreate], Field(min_length=1, max_length=MAX_DOCUMENTS_PER_BATCH)]
+
+
 class Document(BaseModel):
     id: int
     title: str
     file_url: str
     document_type: Optional[str] = None
     owner_id: int
+    content_type: Optional[str] = None
+    size: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
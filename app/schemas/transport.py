@@ -1,7 +1,25 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
 
 class BalanceResponse(BaseModel):
     balance: float
 
 class RechargeRequest(BaseModel):
-    amount: float
\ No newline at end of file
+    amount: float
+
+class BatchRechargeItem(BaseModel):
+    user_id: int
+    amount: float
+
+class BatchRechargeRequest(BaseModel):
+    items: List[BatchRechargeItem] = Field(min_length=1, max_length=5000)
+
+class BatchRechargeItemResult(BaseModel):
+    user_id: int
+    amount: float
+    status: Literal["applied", "rejected"]
+    balance: Optional[float] = None
+    detail: Optional[str] = None
+
+class BatchRechargeResponse(BaseModel):
+    results: List[BatchRechargeItemResult]
@@ -10,6 +10,11 @@ class LoginRequest(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -0,0 +1,77 @@
+"""
+Production entry point: gunicorn managing uvicorn workers on uvloop and httptools.
+
+    python -m app.server
+
+The app is imported once in the master (preload) and forked into SERVER_WORKERS
+processes. Workers are recycled gracefully after SERVER_MAX_REQUESTS requests and
+gunicorn replaces any worker that dies. For development keep `uvicorn app.main:app --reload`.
+"""
+import os
+from typing import Any, Dict
+
+from gunicorn.app.base import BaseApplication
+from uvicorn_worker import UvicornWorker
+
+from app.core.config import settings
+
+
+class UvloopWorker(UvicornWorker):
+    """Uvicorn worker pinned to uvloop and httptools instead of picking them when available."""
+    CONFIG_KWARGS = {"loop": "uvloop", "http": "httptools"}
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def post_fork(server, worker) -> None:
+    # Nothing to reset for the DB: the engines are created by the app lifespan, which
+    # runs in each worker, so no pooled connection is inherited from the master.
+    # Every worker has its own bcrypt pool: split the CPUs instead of giving each one all of them
+    from app.core.hashing import password_hashing_pool
+
+    if settings.PASSWORD_HASH_WORKERS is None:
+        password_hashing_pool.max_workers = max(1, default_workers() // server.cfg.workers)
+
+
+def gunicorn_options() -> Dict[str, Any]:
+    return {
+        "bind": settings.SERVER_BIND,
+        "workers": settings.SERVER_WORKERS or default_workers(),
+        "worker_class": UvloopWorker,
+        "preload_app": True,
+        "max_requests": settings.SERVER_MAX_REQUESTS,
+        "max_requests_jitter": settings.SERVER_MAX_REQUESTS_JITTER,
+        "graceful_timeout": settings.SERVER_GRACEFUL_TIMEOUT,
+        "timeout": settings.SERVER_TIMEOUT,
+        "keepalive": settings.SERVER_KEEPALIVE,
+        "backlog": settings.SERVER_BACKLOG,
+        "post_fork": post_fork,
+        "accesslog": "-" if settings.SERVER_ACCESS_LOG else None,
+        "errorlog": "-",
+    }
+
+
+class Server(BaseApplication):
+    """Runs the app under gunicorn with `options` instead of a config file or the command line."""
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from app.main import app
+
+        return app
+
+
+def main() -> None:
+    Server(gunicorn_options()).run()
+
+
+if __name__ == "__main__":
+    main()
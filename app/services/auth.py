@@ -1,28 +1,153 @@
-from datetime import timedelta
+import hashlib
+import secrets
+import uuid
+from datetime import datetime, timedelta, timezone
 from fastapi import HTTPException, status, Depends
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.models.user import User
-from app.schemas.user import Token
-from app.core.security import verify_password, create_access_token
+from app.schemas.user import Token, User as UserSchema
+from app.core.hashing import password_hashing_pool
+from app.core.revocation import revocation_list
+from app.core.security import create_access_token, decode_access_token, user_claims
 from app.core.config import settings
 from app.db.session import get_db
+from app.repos.token import AsyncRefreshTokenRepository, AsyncRevokedTokenRepository, RefreshTokenRepository, RevokedTokenRepository
+from app.services.user import AsyncUserService, UserService
+from typing import NamedTuple, Optional
 
-def authenticate_user(db: Session, email: str, password: str) -> User | None:
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+def get_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+async def authenticate_user(db: Session, email: str, password: str) -> User | None:
+    user = await run_in_threadpool(get_user_by_email, db, email)
+    if not user or not await password_hashing_pool.verify(password, user.hashed_password):
         return None
     return user
 
-def login_user(email: str, password: str, db: Session) -> Token:
-    user = authenticate_user(db, email, password)
+async def login_user(email: str, password: str, db: Session) -> Token:
+    user = await authenticate_user(db, email, password)
+    if not user:
+        raise _invalid_login()
+    return await run_in_threadpool(issue_tokens, user, RefreshTokenRepository(db))
+
+async def async_login_user(email: str, password: str, user_service: AsyncUserService, refresh_token_repo: AsyncRefreshTokenRepository) -> Token:
+    user = await user_service.authenticate_user(email, password)
     if not user:
+        raise _invalid_login()
+    return await async_issue_tokens(user, refresh_token_repo)
+
+def _invalid_login() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid email or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def hash_refresh_token(refresh_token: str) -> str:
+    # Refresh tokens are random 256-bit values: a plain SHA-256 is enough to store them
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+class _IssuedTokens(NamedTuple):
+    token: Token
+    refresh_token_hash: str
+    family_id: str
+    refresh_expires_at: datetime
+
+def _new_tokens(user: User, family_id: Optional[str] = None) -> _IssuedTokens:
+    """A short-lived access token with the user's claims and the next refresh token of a family."""
+    expires_in = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    access_token = create_access_token(
+        data=user_claims(UserSchema.model_validate(user)), expires_delta=timedelta(seconds=expires_in)
+    )
+    refresh_token = secrets.token_urlsafe(32)
+    return _IssuedTokens(
+        token=Token(access_token=access_token, token_type="bearer", expires_in=expires_in, refresh_token=refresh_token),
+        refresh_token_hash=hash_refresh_token(refresh_token),
+        family_id=family_id or uuid.uuid4().hex,
+        refresh_expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+def issue_tokens(user: User, refresh_token_repo: RefreshTokenRepository, family_id: Optional[str] = None) -> Token:
+    """Issues an access token and stores its refresh token (a new family unless `family_id` is given)."""
+    issued = _new_tokens(user, family_id)
+    refresh_token_repo.create(issued.refresh_token_hash, issued.family_id, user.id, issued.refresh_expires_at)
+    return issued.token
+
+async def async_issue_tokens(user: User, refresh_token_repo: AsyncRefreshTokenRepository, family_id: Optional[str] = None) -> Token:
+    issued = _new_tokens(user, family_id)
+    await refresh_token_repo.create(issued.refresh_token_hash, issued.family_id, user.id, issued.refresh_expires_at)
+    return issued.token
+
+def refresh_tokens(refresh_token: str, refresh_token_repo: RefreshTokenRepository, user_service: UserService) -> Token:
+    """
+    Exchanges a refresh token for a new access token and the next refresh token of its
+    family. Reusing an already exchanged refresh token revokes its whole family.
+    Marking the token as used, loading the user and storing the next token happen in one
+    transaction: if any of them fails the token stays valid. Inactive users are rejected.
+    """
+    token_hash = hash_refresh_token(refresh_token)
+    used = refresh_token_repo.use(token_hash, datetime.now(timezone.utc))
+    if used is None:
+        refresh_token_repo.revoke_family_if_used(token_hash)
+        raise _invalid_refresh_token()
+
+    user = user_service.get_user_by_id(used.user_id)
+    if user is None or not user.is_active:
+        # Nothing was committed: the request session discards the UPDATE
+        raise _invalid_refresh_token()
+    return issue_tokens(user, refresh_token_repo, used.family_id)
+
+async def async_refresh_tokens(refresh_token: str, refresh_token_repo: AsyncRefreshTokenRepository, user_service: AsyncUserService) -> Token:
+    token_hash = hash_refresh_token(refresh_token)
+    used = await refresh_token_repo.use(token_hash, datetime.now(timezone.utc))
+    if used is None:
+        await refresh_token_repo.revoke_family_if_used(token_hash)
+        raise _invalid_refresh_token()
+
+    user = await user_service.get_user_by_id(used.user_id)
+    if user is None or not user.is_active:
+        raise _invalid_refresh_token()
+    return await async_issue_tokens(user, refresh_token_repo, used.family_id)
+
+def _revocation(token: str) -> tuple[str, int | None, datetime] | None:
+    """jti, user id and expiration of a token to revoke; None for tokens without a jti."""
+    payload = decode_access_token(token)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password",
+            detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
-    )
-    return Token(access_token=access_token, token_type="bearer")
\ No newline at end of file
+    if "jti" not in payload:
+        return None
+    sub = payload.get("sub")
+    expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+    return payload["jti"], int(sub) if sub is not None else None, expires_at
+
+def revoke_access_token(token: str, revoked_token_repo: RevokedTokenRepository) -> None:
+    """
+    Revokes a token until it expires: in this worker right away, in the others at their
+    next sync of the revocation list.
+    """
+    revocation = _revocation(token)
+    if revocation is None:
+        return
+    revoked_token_repo.revoke(*revocation)
+    jti, _, expires_at = revocation
+    revocation_list.add(jti, expires_at.timestamp())
+
+async def async_revoke_access_token(token: str, revoked_token_repo: AsyncRevokedTokenRepository) -> None:
+    revocation = _revocation(token)
+    if revocation is None:
+        return
+    await revoked_token_repo.revoke(*revocation)
+    jti, _, expires_at = revocation
+    revocation_list.add(jti, expires_at.timestamp())
@@ -1,4 +1,10 @@
+import hashlib
+import threading
+from typing import Dict, Mapping, Optional, Tuple
+from app.core.cache import SharedCacheBackend, TTLCache
+from app.core.config import settings
 from app.schemas.chatbot import ChatbotRequest, ChatbotResponse
+from app.services.keyword_matcher import KeywordMatcher, normalize_text
 
 class ChatbotService:
 
@@ -10,13 +16,60 @@ class ChatbotService:
     }
     DEFAULT_RESPONSE = "Desculpe, não entendi sua pergunta. Posso ajudar com informações sobre saldo de transporte ou documentos digitais?"
 
+    def __init__(
+        self,
+        response_map: Optional[Mapping[Tuple[str, ...], str]] = None,
+        cache_size: int = settings.CHATBOT_CACHE_MAX_SIZE,
+        shared_cache: Optional[SharedCacheBackend] = None,
+    ):
+        # The default catalog is compiled once at import; custom ones when the service is built
+        self.matcher = DEFAULT_MATCHER if response_map is None else KeywordMatcher(response_map.items())
+        self.shared_cache = shared_cache
+        self._answers: TTLCache[str, str] = TTLCache(maxsize=cache_size)
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
     def get_chatbot_response(self, question: str) -> str:
         """
-        Returns a predefined response based on the user's question using a dictionary for mapping keywords to responses.
+        Returns a predefined response based on the user's question.
+        Keywords are matched ignoring case and accents; earlier entries of the map win.
+        Answers are cached by normalized question, locally and in the shared cache if any.
         """
-        question_lower = question.lower()
+        normalized = " ".join(normalize_text(question).split())
+
+        answer = self._answers.get(normalized)
+        if answer is not None:
+            self._count("hits")
+            return answer
+
+        shared_key = None
+        if self.shared_cache is not None:
+            shared_key = "chatbot:answer:" + hashlib.sha256(normalized.encode()).hexdigest()
+            answer = self.shared_cache.get(shared_key)
+
+        if answer is not None:
+            self._count("shared_hits")
+        else:
+            self._count("misses")
+            answer = self.matcher.match_normalized(normalized)
+            if answer is None:
+                answer = self.DEFAULT_RESPONSE
+            if shared_key is not None:
+                self.shared_cache.set(shared_key, answer, ttl=settings.CHATBOT_SHARED_CACHE_TTL_SECONDS)
+
+        self._answers.set(normalized, answer)
+        return answer
+
+    def _count(self, counter: str) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the answer cache."""
+        with self._stats_lock:
+            return {"hits": self.hits, "shared_hits": self.shared_hits, "misses": self.misses, "cached_answers": len(self._answers)}
+
 
-        for keywords, response in self.RESPONSE_MAP.items():
-            if any(keyword in question_lower for keyword in keywords):
-                return response
-        return self.DEFAULT_RESPONSE
\ No newline at end of file
+DEFAULT_MATCHER: KeywordMatcher[str] = KeywordMatcher(ChatbotService.RESPONSE_MAP.items())
@@ -1,14 +1,146 @@
+import base64
+import binascii
+import hashlib
+import uuid
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple
 
-from app.repos.document import DocumentRepository
-from app.schemas.document import DocumentCreate, Document as DocumentSchema 
+from app.core.conditional import CacheValidators, ConditionalRequest, make_etag
+from app.core.config import settings
+from app.repos.document import AsyncDocumentRepository, DocumentRepository
+from app.schemas.document import DocumentCreate, DocumentFile, StoredDocumentCreate, Document as DocumentSchema
 from app.schemas.user import User as UserSchema
+from app.storage import StorageBackend
 from fastapi import HTTPException, status
+from pydantic import TypeAdapter
+from fastapi.concurrency import run_in_threadpool
+
+
+# NDJSON lines per chunk of a stream: fewer, larger writes (and compression flushes)
+STREAM_LINES_PER_CHUNK = 100
+
+# Builds the schemas of a whole list of row mappings in one pydantic-core call
+document_list_adapter = TypeAdapter(List[DocumentSchema])
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encodes the id of the last document of a page as an opaque cursor."""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+def decode_cursor(cursor: str) -> int:
+    """Decodes a cursor produced by `encode_cursor`, raising 400 if it is malformed."""
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def content_url(document_id: int) -> str:
+    """URL of the download route of an uploaded document."""
+    return f"{settings.API_V1_STR}/documents/{document_id}/content"
+
+def parse_byte_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parses a single `bytes=` Range header into inclusive (start, end) offsets.
+    Returns None when the whole file should be sent (no header, or several ranges,
+    which RFC 9110 lets servers ignore) and raises 416 when it cannot be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    first, _, last = range_header[len("bytes="):].strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+        else:
+            start, end = max(size - int(last), 0), size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+async def limit_upload_size(chunks: AsyncIterable[bytes], max_size: int) -> AsyncIterator[bytes]:
+    """Passes the chunks of an upload through, raising 413 once it grows past `max_size`."""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > max_size:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="File too large")
+        yield chunk
+
+async def store_upload(
+    storage: StorageBackend,
+    chunks: AsyncIterable[bytes],
+    blob_exists: Callable[[str], Awaitable[bool]],
+    expected_sha256: Optional[str] = None,
+) -> Tuple[str, int]:
+    """
+    Streams an upload into the storage, keyed by the SHA-256 of its content, which is
+    computed as the chunks arrive. Returns the key and the size.
+
+    A blob that is already stored is not kept twice: the upload is dropped once the
+    hash is known, or not written at all when the client announced the hash
+    (`expected_sha256`) and it matches a stored blob. The bytes are still read and
+    hashed in that case, so the announced hash alone never grants access to a file.
+    """
+    hasher = hashlib.sha256()
+
+    async def hashed_chunks() -> AsyncIterator[bytes]:
+        async for chunk in limit_upload_size(chunks, settings.MAX_UPLOAD_SIZE_BYTES):
+            hasher.update(chunk)
+            yield chunk
+
+    def check_digest(size: int) -> str:
+        if size == 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file")
+        digest = hasher.hexdigest()
+        if expected_sha256 and digest != expected_sha256:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Content does not match X-Content-SHA256")
+        return digest
+
+    if expected_sha256 and await blob_exists(expected_sha256):
+        size = 0
+        async for chunk in hashed_chunks():
+            size += len(chunk)
+        return check_digest(size), size
+
+    upload_key = f"upload-{uuid.uuid4().hex}"
+    size = await storage.save(upload_key, hashed_chunks())
+    try:
+        digest = check_digest(size)
+        if await blob_exists(digest):
+            await storage.delete(upload_key)
+        else:
+            await storage.move(upload_key, digest)
+    except BaseException:
+        await storage.delete(upload_key)
+        raise
+    return digest, size
+
+def _document_validators(db_document) -> CacheValidators:
+    return CacheValidators(make_etag("document", db_document.id, db_document.updated_at), db_document.updated_at)
+
+def _page_validators(owner_id: int, version, limit: int, after_id: Optional[int]) -> CacheValidators:
+    etag = make_etag("documents", owner_id, version.count, version.last_id, version.last_updated_at, limit, after_id)
+    return CacheValidators(etag, version.last_updated_at)
+
+def _document_file(db_document) -> DocumentFile:
+    if not db_document:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+    if not db_document.storage_key:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document has no stored file")
+    return DocumentFile.model_validate(db_document, from_attributes=True)
+
 
 class DocumentService:
-    def __init__(self, document_repo: DocumentRepository):
+    def __init__(self, document_repo: DocumentRepository, storage: Optional[StorageBackend] = None):
         self.document_repo = document_repo
+        self.storage = storage
 
     def create_document_for_user(self, document_data: DocumentCreate, current_user: UserSchema) -> DocumentSchema:
         """Creates a document for the currently authenticated user."""
@@ -17,16 +149,166 @@ class DocumentService:
 
         return DocumentSchema.model_validate(db_document)
 
-    def get_documents_by_user(self, current_user: UserSchema) -> List[DocumentSchema]:
-        """Lists all documents for the currently authenticated user."""
-        db_documents = self.document_repo.get_documents_by_owner(owner_id=current_user.id)
+    def create_documents_for_user(self, documents_data: List[DocumentCreate], current_user: UserSchema) -> List[DocumentSchema]:
+        """Creates many documents at once for the currently authenticated user."""
+        rows = self.document_repo.create_documents(documents_data, owner_id=current_user.id)
+
+        return [DocumentSchema.model_validate(row) for row in rows]
+
+    async def upload_document_for_user(self, title: str, document_type: Optional[str], content_type: str, chunks: AsyncIterable[bytes], current_user: UserSchema, expected_sha256: Optional[str] = None) -> DocumentSchema:
+        """Stores an uploaded file, streamed chunk by chunk, and creates its document."""
+        async def blob_exists(key: str) -> bool:
+            return await run_in_threadpool(self.document_repo.has_blob, key)
+
+        key, size = await store_upload(self.storage, chunks, blob_exists, expected_sha256)
+        document_data = StoredDocumentCreate(
+            title=title, document_type=document_type, storage_key=key, content_type=content_type, size=size
+        )
+        # If this fails the stored file may be left without a document; it is not deleted
+        # here because a concurrent upload of the same content may be linking to it
+        db_document = await run_in_threadpool(
+            self.document_repo.create_stored_document, document_data, current_user.id, content_url
+        )
+
+        return DocumentSchema.model_validate(db_document)
+
+    def get_user_document_file(self, document_id: int, current_user: UserSchema) -> DocumentFile:
+        """Retrieves where the file of a document of the logged-in user is stored."""
+        return _document_file(self.document_repo.get_document_by_id_and_owner(document_id, current_user.id))
+
+    def get_documents_page_by_user(self, current_user: UserSchema, limit: int, cursor: Optional[str] = None, conditions: Optional[ConditionalRequest] = None) -> Tuple[Optional[List[DocumentSchema]], Optional[str], CacheValidators]:
+        """
+        Lists one page of documents for the currently authenticated user.
+        Returns the page, the cursor of the next one (None on the last page) and the
+        validators of the page; the page is None when the client copy is still current.
+        """
+        after_id = decode_cursor(cursor) if cursor else None
+        # The collection version is checked first, so a 304 never loads the page
+        version = self.document_repo.get_collection_version(current_user.id)
+        validators = _page_validators(current_user.id, version, limit, after_id)
+        if validators.not_modified(conditions):
+            return None, None, validators
 
-        return [DocumentSchema.model_validate(doc) for doc in db_documents]
+        # One extra row tells whether there is a next page without a COUNT query
+        rows = self.document_repo.get_documents_page_by_owner(current_user.id, limit + 1, after_id)
 
-    def get_user_document_by_id(self, document_id: int, current_user: UserSchema) -> Optional[DocumentSchema]:
-        """Retrieves a specific document for the logged-in user."""
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["id"])
+
+        return document_list_adapter.validate_python(rows), next_cursor, validators
+
+    def stream_documents_by_user(self, current_user: UserSchema, cursor: Optional[str] = None) -> Iterator[bytes]:
+        """Yields the documents of the currently authenticated user as NDJSON lines."""
+        after_id = decode_cursor(cursor) if cursor else None
+
+        def generate() -> Iterator[bytes]:
+            lines = []
+            for row in self.document_repo.iter_documents_by_owner(current_user.id, after_id):
+                lines.append(DocumentSchema.model_validate(row).model_dump_json().encode())
+                if len(lines) == STREAM_LINES_PER_CHUNK:
+                    yield b"\n".join(lines) + b"\n"
+                    lines = []
+            if lines:
+                yield b"\n".join(lines) + b"\n"
+
+        return generate()
+
+    def get_user_document_by_id(self, document_id: int, current_user: UserSchema, conditions: Optional[ConditionalRequest] = None) -> Tuple[Optional[DocumentSchema], CacheValidators]:
+        """
+        Retrieves a specific document for the logged-in user, with its validators.
+        The document is None (and is not validated) when the client copy is still current.
+        """
         db_document = self.document_repo.get_document_by_id_and_owner(document_id, current_user.id)
         if not db_document:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+        validators = _document_validators(db_document)
+        if validators.not_modified(conditions):
+            return None, validators
+        return DocumentSchema.model_validate(db_document), validators
+
+
+class AsyncDocumentService:
+    """
+    AsyncSession counterpart of DocumentService, used when ASYNC_DB is enabled.
+    """
+    def __init__(self, document_repo: AsyncDocumentRepository, storage: Optional[StorageBackend] = None):
+        self.document_repo = document_repo
+        self.storage = storage
+
+    async def create_document_for_user(self, document_data: DocumentCreate, current_user: UserSchema) -> DocumentSchema:
+        """Creates a document for the currently authenticated user."""
+        db_document = await self.document_repo.create_document(document_data, owner_id=current_user.id)
+
+        return DocumentSchema.model_validate(db_document)
+
+    async def create_documents_for_user(self, documents_data: List[DocumentCreate], current_user: UserSchema) -> List[DocumentSchema]:
+        """Creates many documents at once for the currently authenticated user."""
+        rows = await self.document_repo.create_documents(documents_data, owner_id=current_user.id)
+
+        return [DocumentSchema.model_validate(row) for row in rows]
+
+    async def upload_document_for_user(self, title: str, document_type: Optional[str], content_type: str, chunks: AsyncIterable[bytes], current_user: UserSchema, expected_sha256: Optional[str] = None) -> DocumentSchema:
+        """Stores an uploaded file, streamed chunk by chunk, and creates its document."""
+        key, size = await store_upload(self.storage, chunks, self.document_repo.has_blob, expected_sha256)
+        document_data = StoredDocumentCreate(
+            title=title, document_type=document_type, storage_key=key, content_type=content_type, size=size
+        )
+        db_document = await self.document_repo.create_stored_document(document_data, current_user.id, content_url)
+
         return DocumentSchema.model_validate(db_document)
 
+    async def get_user_document_file(self, document_id: int, current_user: UserSchema) -> DocumentFile:
+        """Retrieves where the file of a document of the logged-in user is stored."""
+        return _document_file(await self.document_repo.get_document_by_id_and_owner(document_id, current_user.id))
+
+    async def get_documents_page_by_user(self, current_user: UserSchema, limit: int, cursor: Optional[str] = None, conditions: Optional[ConditionalRequest] = None) -> Tuple[Optional[List[DocumentSchema]], Optional[str], CacheValidators]:
+        """
+        Lists one page of documents for the currently authenticated user.
+        Returns the page, the cursor of the next one (None on the last page) and the
+        validators of the page; the page is None when the client copy is still current.
+        """
+        after_id = decode_cursor(cursor) if cursor else None
+        version = await self.document_repo.get_collection_version(current_user.id)
+        validators = _page_validators(current_user.id, version, limit, after_id)
+        if validators.not_modified(conditions):
+            return None, None, validators
+
+        rows = await self.document_repo.get_documents_page_by_owner(current_user.id, limit + 1, after_id)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["id"])
+
+        return document_list_adapter.validate_python(rows), next_cursor, validators
+
+    def stream_documents_by_user(self, current_user: UserSchema, cursor: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Yields the documents of the currently authenticated user as NDJSON lines."""
+        after_id = decode_cursor(cursor) if cursor else None
+
+        async def generate() -> AsyncIterator[bytes]:
+            lines = []
+            async for row in self.document_repo.iter_documents_by_owner(current_user.id, after_id):
+                lines.append(DocumentSchema.model_validate(row).model_dump_json().encode())
+                if len(lines) == STREAM_LINES_PER_CHUNK:
+                    yield b"\n".join(lines) + b"\n"
+                    lines = []
+            if lines:
+                yield b"\n".join(lines) + b"\n"
+
+        return generate()
+
+    async def get_user_document_by_id(self, document_id: int, current_user: UserSchema, conditions: Optional[ConditionalRequest] = None) -> Tuple[Optional[DocumentSchema], CacheValidators]:
+        """
+        Retrieves a specific document for the logged-in user, with its validators.
+        The document is None (and is not validated) when the client copy is still current.
+        """
+        db_document = await self.document_repo.get_document_by_id_and_owner(document_id, current_user.id)
+        if not db_document:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Document not found")
+        validators = _document_validators(db_document)
+        if validators.not_modified(conditions):
+            return None, validators
+        return DocumentSchema.model_validate(db_document), validators
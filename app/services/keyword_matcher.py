@@ -0,0 +1,87 @@
+import unicodedata
+from collections import deque
+from typing import Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercases the text and strips accents, so "Serviço" and "servico" compare equal."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class KeywordMatcher(Generic[T]):
+    """
+    Aho-Corasick automaton over a catalog of (keywords, value) entries.
+    `match` scans the text once, whatever the number of keywords, and returns the value
+    of the first entry (catalog order = priority) with a keyword contained in the text.
+    """
+    def __init__(self, entries: Iterable[Tuple[Iterable[str], T]]):
+        self._values: List[T] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        # Best (lowest) entry index of the keywords ending at each node, -1 for none
+        self._best: List[int] = [-1]
+
+        for priority, (keywords, value) in enumerate(entries):
+            self._values.append(value)
+            for keyword in keywords:
+                self._add(normalize_text(keyword), priority)
+
+        self._fail = self._build_failure_links()
+
+    def _add(self, keyword: str, priority: int) -> None:
+        if not keyword:
+            return
+        node = 0
+        for char in keyword:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._best.append(-1)
+            node = next_node
+        if self._best[node] == -1 or priority < self._best[node]:
+            self._best[node] = priority
+
+    def _build_failure_links(self) -> List[int]:
+        # Breadth-first, so the failure link of a node is known before its children's
+        fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in self._goto[state]:
+                    state = fail[state]
+                fail[child] = self._goto[state].get(char, 0)
+                # Keywords that are suffixes of this one also end here
+                inherited = self._best[fail[child]]
+                if inherited != -1 and (self._best[child] == -1 or inherited < self._best[child]):
+                    self._best[child] = inherited
+        return fail
+
+    def match(self, text: str) -> Optional[T]:
+        return self.match_normalized(normalize_text(text))
+
+    def match_normalized(self, text: str) -> Optional[T]:
+        """`match` for text that already went through `normalize_text`."""
+        goto, fail, best_at = self._goto, self._fail, self._best
+        best = -1
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = best_at[state]
+            if found != -1 and (best == -1 or found < best):
+                best = found
+                if best == 0:
+                    # Nothing can beat the first entry
+                    break
+        return self._values[best] if best != -1 else None
+
+    def __len__(self) -> int:
+        return len(self._values)
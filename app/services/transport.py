@@ -1,24 +1,75 @@
-from typing import Dict
+from typing import List, Optional
+from app.repos.transport import TransportRepository
+from app.schemas.transport import BatchRechargeItem, BatchRechargeItemResult
 from app.schemas.user import User as UserSchema
 from fastapi import HTTPException, status
 
-mock_balances: Dict[int, float] = {}
+
+def _invalid_amount(amount: float) -> Optional[str]:
+    """Why a top-up amount can't be applied, or None when it is valid."""
+    if amount <= 0:
+        return "Top-up amount must be positive"
+    # Balances and the ledger keep cents: anything finer would be reported but not stored
+    if round(amount, 2) != amount:
+        return "Top-up amount must have at most 2 decimal places"
+    return None
 
 class TransportService:
+    def __init__(self, transport_repo: TransportRepository):
+        self.transport_repo = transport_repo
+
     def get_balance(self, current_user: UserSchema) -> float:
-        """Query user balance (mocked)."""
-        return mock_balances.get(current_user.id, 0.0)
+        """Query user balance."""
+        return self.transport_repo.get_balance(current_user.id)
 
-    def recharge_balance(self, current_user: UserSchema, amount: float) -> float:
-        """Simulate user balance top-up (mocked)."""
-        if amount <= 0:
+    def recharge_balance(self, current_user: UserSchema, amount: float, idempotency_key: Optional[str] = None) -> float:
+        """Top up the user balance, at most once per idempotency key."""
+        detail = _invalid_amount(amount)
+        if detail is not None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Top-up amount must be positive"
+                detail=detail
+            )
+
+        entry = self.transport_repo.recharge(current_user.id, amount, idempotency_key)
+        # Amounts are stored with cents precision
+        if round(entry.amount, 2) != round(amount, 2):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Idempotency-Key was already used for a different amount"
             )
 
-        current_balance = mock_balances.get(current_user.id, 0.0)
-        new_balance = current_balance + amount
-        mock_balances[current_user.id] = new_balance
+        return entry.balance_after
+
+    def recharge_batch(self, current_user: UserSchema, items: List[BatchRechargeItem]) -> List[BatchRechargeItemResult]:
+        """
+        Tops up many users at once (employers, schools). Invalid items are rejected
+        individually; the valid ones are applied together in a single transaction.
+        """
+        if not current_user.is_superuser:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not enough permissions"
+            )
+
+        existing_user_ids = self.transport_repo.get_existing_user_ids(item.user_id for item in items)
+
+        results: List[BatchRechargeItemResult] = []
+        accepted: List[int] = []
+        for item in items:
+            result = BatchRechargeItemResult(user_id=item.user_id, amount=item.amount, status="applied")
+            detail = _invalid_amount(item.amount)
+            if detail is not None:
+                result.status, result.detail = "rejected", detail
+            elif item.user_id not in existing_user_ids:
+                result.status, result.detail = "rejected", "User not found"
+            else:
+                accepted.append(len(results))
+            results.append(result)
+
+        if accepted:
+            balances = self.transport_repo.recharge_many([(results[i].user_id, results[i].amount) for i in accepted])
+            for i, balance in zip(accepted, balances):
+                results[i].balance = balance
 
-        return new_balance
+        return results
@@ -0,0 +1,34 @@
+from typing import Optional
+
+from app.storage.base import StorageBackend
+from app.storage.local import LocalStorage
+from app.storage.s3 import LocalObjectStoreClient, ObjectStorage, ObjectStoreClient
+
+
+def build_storage(backend: str, root: str, bucket: str, endpoint_url: Optional[str] = None) -> StorageBackend:
+    """
+    Builds the storage configured by STORAGE_BACKEND:
+    "local" (files under `root`), "s3" (boto3 client, optional dependency) or
+    "s3-local" (ObjectStorage over LocalObjectStoreClient, for development).
+    """
+    if backend == "local":
+        return LocalStorage(root)
+    if backend == "s3-local":
+        return ObjectStorage(LocalObjectStoreClient(root), bucket)
+    if backend == "s3":
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires boto3 (pip install boto3)")
+        return ObjectStorage(boto3.client("s3", endpoint_url=endpoint_url), bucket)
+    raise ValueError(f"Unknown storage backend: {backend!r}")
+
+
+__all__ = [
+    "StorageBackend",
+    "LocalStorage",
+    "ObjectStorage",
+    "ObjectStoreClient",
+    "LocalObjectStoreClient",
+    "build_storage",
+]
@@ -0,0 +1,43 @@
+import re
+from abc import ABC, abstractmethod
+from typing import AsyncIterable, AsyncIterator, Optional
+
+_KEY_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def check_key(key: str) -> str:
+    """Storage keys are generated by the API; anything else would allow path traversal."""
+    if not _KEY_PATTERN.match(key):
+        raise ValueError(f"Invalid storage key: {key!r}")
+    return key
+
+
+class StorageBackend(ABC):
+    """
+    Stores the files of the documents. Uploads and downloads go through async
+    iterators of chunks so a file is never held in memory as a whole.
+    """
+    chunk_size = 64 * 1024
+
+    @abstractmethod
+    async def save(self, key: str, chunks: AsyncIterable[bytes]) -> int:
+        """
+        Writes the chunks under `key` and returns the number of bytes stored.
+        If the iterator raises, nothing is left behind and the exception propagates.
+        """
+
+    @abstractmethod
+    def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        """Yields the bytes from `start` to `end` (inclusive) of a stored file."""
+
+    @abstractmethod
+    async def move(self, source_key: str, target_key: str) -> None:
+        """Renames a stored file, replacing `target_key` if it exists."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Path of the file on the local disk, when the backend has one (served with FileResponse)."""
+        return None
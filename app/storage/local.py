@@ -0,0 +1,66 @@
+import os
+import uuid
+from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, Optional
+
+import anyio
+
+from app.storage.base import StorageBackend, check_key
+
+
+class LocalStorage(StorageBackend):
+    """
+    Files on the local filesystem, spread in subdirectories by the first two
+    characters of the key. Uploads are written to a temporary file and moved
+    into place once complete, so readers never see a partial file.
+    """
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        check_key(key)
+        return self.root / key[:2] / key
+
+    async def save(self, key: str, chunks: AsyncIterable[bytes]) -> int:
+        path = self._path(key)
+        await anyio.to_thread.run_sync(lambda: path.parent.mkdir(parents=True, exist_ok=True))
+        tmp_path = path.with_name(f".{key}.{uuid.uuid4().hex}.part")
+
+        size = 0
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as file:
+                async for chunk in chunks:
+                    await file.write(chunk)
+                    size += len(chunk)
+            await anyio.to_thread.run_sync(os.replace, tmp_path, path)
+        except BaseException:
+            await anyio.to_thread.run_sync(lambda: tmp_path.unlink(missing_ok=True))
+            raise
+        return size
+
+    async def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        async with await anyio.open_file(self._path(key), "rb") as file:
+            await file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    async def move(self, source_key: str, target_key: str) -> None:
+        source, target = self._path(source_key), self._path(target_key)
+
+        def rename() -> None:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, target)
+
+        await anyio.to_thread.run_sync(rename)
+
+    async def delete(self, key: str) -> None:
+        path = self._path(key)
+        await anyio.to_thread.run_sync(lambda: path.unlink(missing_ok=True))
+
+    def local_path(self, key: str) -> Optional[str]:
+        return str(self._path(key))
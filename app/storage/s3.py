@@ -0,0 +1,189 @@
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, BinaryIO, Dict, List, Optional, Protocol
+
+import anyio
+
+from app.storage.base import StorageBackend, check_key
+
+# S3 rejects multipart parts smaller than 5 MiB (except the last one)
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+
+
+class ObjectStoreClient(Protocol):
+    """
+    The subset of the boto3 S3 client used by ObjectStorage. Any S3-compatible
+    store (AWS, MinIO, R2...) works through boto3; LocalObjectStoreClient
+    implements the same calls on the local disk.
+    """
+    def create_multipart_upload(self, *, Bucket: str, Key: str, **kwargs: Any) -> Dict[str, Any]: ...
+    def upload_part(self, *, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes) -> Dict[str, Any]: ...
+    def complete_multipart_upload(self, *, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict[str, Any]) -> Dict[str, Any]: ...
+    def abort_multipart_upload(self, *, Bucket: str, Key: str, UploadId: str) -> Dict[str, Any]: ...
+    def get_object(self, *, Bucket: str, Key: str, Range: Optional[str] = None) -> Dict[str, Any]: ...
+    def copy_object(self, *, Bucket: str, Key: str, CopySource: Dict[str, str]) -> Dict[str, Any]: ...
+    def delete_object(self, *, Bucket: str, Key: str) -> Dict[str, Any]: ...
+
+
+class ObjectStorage(StorageBackend):
+    """
+    Files in an S3-compatible bucket. Uploads are sent as multipart uploads of
+    `part_size` bytes, so at most one part is buffered per request; downloads
+    use ranged GETs. The client is blocking (boto3) and runs in the threadpool.
+    """
+    def __init__(self, client: ObjectStoreClient, bucket: str, part_size: int = DEFAULT_PART_SIZE):
+        self.client = client
+        self.bucket = bucket
+        self.part_size = part_size
+
+    async def save(self, key: str, chunks: AsyncIterable[bytes]) -> int:
+        check_key(key)
+        upload = await anyio.to_thread.run_sync(
+            lambda: self.client.create_multipart_upload(Bucket=self.bucket, Key=key)
+        )
+        upload_id = upload["UploadId"]
+        parts: List[Dict[str, Any]] = []
+
+        async def upload_part(body: bytes) -> None:
+            part_number = len(parts) + 1
+            result = await anyio.to_thread.run_sync(
+                lambda: self.client.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body
+                )
+            )
+            parts.append({"PartNumber": part_number, "ETag": result["ETag"]})
+
+        size = 0
+        buffer = bytearray()
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                if len(buffer) >= self.part_size:
+                    await upload_part(bytes(buffer))
+                    buffer.clear()
+            if buffer or not parts:
+                await upload_part(bytes(buffer))
+            await anyio.to_thread.run_sync(
+                lambda: self.client.complete_multipart_upload(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+                )
+            )
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(
+                    lambda: self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+                )
+            raise
+        return size
+
+    async def iter_range(self, key: str, start: int, end: int) -> AsyncIterator[bytes]:
+        check_key(key)
+        response = await anyio.to_thread.run_sync(
+            lambda: self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}")
+        )
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await anyio.to_thread.run_sync(body.read, self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def move(self, source_key: str, target_key: str) -> None:
+        # S3 has no rename: a server-side copy, then the source is removed
+        check_key(source_key)
+        check_key(target_key)
+        await anyio.to_thread.run_sync(
+            lambda: self.client.copy_object(
+                Bucket=self.bucket, Key=target_key, CopySource={"Bucket": self.bucket, "Key": source_key}
+            )
+        )
+        await self.delete(source_key)
+
+    async def delete(self, key: str) -> None:
+        check_key(key)
+        await anyio.to_thread.run_sync(lambda: self.client.delete_object(Bucket=self.bucket, Key=key))
+
+
+class _RangeBody:
+    """File object limited to `length` bytes, like the StreamingBody of boto3."""
+    def __init__(self, file: BinaryIO, length: int):
+        self._file = file
+        self._remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        chunk = self._file.read(size)
+        self._remaining -= len(chunk)
+        return chunk
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class LocalObjectStoreClient:
+    """
+    Stand-in for an S3 client that keeps buckets as directories under `root`.
+    Used for development and tests of ObjectStorage without a real object store.
+    """
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _object_path(self, bucket: str, key: str) -> Path:
+        return self.root / bucket / key
+
+    def _upload_dir(self, bucket: str, upload_id: str) -> Path:
+        return self.root / bucket / ".uploads" / upload_id
+
+    def create_multipart_upload(self, *, Bucket: str, Key: str, **kwargs: Any) -> Dict[str, Any]:
+        upload_id = uuid.uuid4().hex
+        self._upload_dir(Bucket, upload_id).mkdir(parents=True)
+        return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+    def upload_part(self, *, Bucket: str, Key: str, UploadId: str, PartNumber: int, Body: bytes) -> Dict[str, Any]:
+        (self._upload_dir(Bucket, UploadId) / str(PartNumber)).write_bytes(Body)
+        return {"ETag": f'"{UploadId}-{PartNumber}"'}
+
+    def complete_multipart_upload(self, *, Bucket: str, Key: str, UploadId: str, MultipartUpload: Dict[str, Any]) -> Dict[str, Any]:
+        upload_dir = self._upload_dir(Bucket, UploadId)
+        path = self._object_path(Bucket, Key)
+        tmp_path = upload_dir / "object"
+        with open(tmp_path, "wb") as target:
+            for part in sorted(MultipartUpload["Parts"], key=lambda part: part["PartNumber"]):
+                with open(upload_dir / str(part["PartNumber"]), "rb") as source:
+                    shutil.copyfileobj(source, target)
+        os.replace(tmp_path, path)
+        shutil.rmtree(upload_dir)
+        return {"Bucket": Bucket, "Key": Key}
+
+    def abort_multipart_upload(self, *, Bucket: str, Key: str, UploadId: str) -> Dict[str, Any]:
+        shutil.rmtree(self._upload_dir(Bucket, UploadId), ignore_errors=True)
+        return {}
+
+    def get_object(self, *, Bucket: str, Key: str, Range: Optional[str] = None) -> Dict[str, Any]:
+        path = self._object_path(Bucket, Key)
+        size = path.stat().st_size
+        start, end = 0, size - 1
+        if Range:
+            first, _, last = Range.removeprefix("bytes=").partition("-")
+            start, end = int(first), min(int(last), size - 1)
+        file = open(path, "rb")
+        file.seek(start)
+        length = max(end - start + 1, 0)
+        return {"Body": _RangeBody(file, length), "ContentLength": length}
+
+    def copy_object(self, *, Bucket: str, Key: str, CopySource: Dict[str, str]) -> Dict[str, Any]:
+        tmp_path = self._object_path(Bucket, f".{Key}.{uuid.uuid4().hex}.copy")
+        shutil.copyfile(self._object_path(CopySource["Bucket"], CopySource["Key"]), tmp_path)
+        os.replace(tmp_path, self._object_path(Bucket, Key))
+        return {}
+
+    def delete_object(self, *, Bucket: str, Key: str) -> Dict[str, Any]:
+        self._object_path(Bucket, Key).unlink(missing_ok=True)
+        return {}
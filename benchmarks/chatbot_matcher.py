@@ -0,0 +1,80 @@
+"""
+Microbenchmark of the chatbot keyword matching.
+
+Builds an intent catalog with thousands of keywords and compares the previous linear
+scan (`any(keyword in question ...)` per entry) with the compiled KeywordMatcher,
+checking that both pick the same answers.
+
+Usage:
+    python -m benchmarks.chatbot_matcher --keywords 5000 --questions 2000
+"""
+import argparse
+import random
+import string
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.services.chatbot import ChatbotService
+from app.services.keyword_matcher import KeywordMatcher, normalize_text
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+
+
+def build_catalog(rng: random.Random, keywords: int, per_intent: int = 5) -> Dict[Tuple[str, ...], str]:
+    catalog = dict(ChatbotService.RESPONSE_MAP)
+    for intent in range(keywords // per_intent):
+        catalog[tuple(random_word(rng) for _ in range(per_intent))] = f"intent {intent}"
+    return catalog
+
+
+def linear_match(catalog: Dict[Tuple[str, ...], str], question: str) -> Optional[str]:
+    question_lower = normalize_text(question)
+    for keywords, response in catalog.items():
+        if any(keyword in question_lower for keyword in keywords):
+            return response
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keywords", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    catalog = build_catalog(rng, args.keywords)
+    all_keywords = [keyword for keywords in catalog for keyword in keywords]
+    questions: List[str] = []
+    for _ in range(args.questions):
+        words = [random_word(rng) for _ in range(rng.randint(4, 12))]
+        if rng.random() < 0.5:
+            words.insert(rng.randrange(len(words)), rng.choice(all_keywords))
+        questions.append(" ".join(words))
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(catalog.items())
+    build_seconds = time.perf_counter() - start
+
+    # Keywords normalized up front, so the scan only pays for the matching itself
+    normalized_catalog = {tuple(normalize_text(k) for k in keywords): answer for keywords, answer in catalog.items()}
+    start = time.perf_counter()
+    expected = [linear_match(normalized_catalog, question) for question in questions]
+    linear_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [matcher.match(question) for question in questions]
+    matcher_seconds = time.perf_counter() - start
+
+    assert actual == expected, "KeywordMatcher disagrees with the linear scan"
+
+    print(f"{len(all_keywords)} keywords, {len(questions)} questions (matcher built in {build_seconds * 1000:.1f} ms)")
+    print(f"{'strategy':<10} {'total_ms':>10} {'us/question':>12}")
+    for name, seconds in (("linear", linear_seconds), ("matcher", matcher_seconds)):
+        print(f"{name:<10} {seconds * 1000:>10.1f} {seconds / len(questions) * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
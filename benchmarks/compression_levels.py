@@ -0,0 +1,80 @@
+"""
+Benchmark of the response compression: CPU time against bytes saved, per codec and level.
+
+Compresses a JSON page of documents and an NDJSON export (sent in chunks of
+STREAM_LINES_PER_CHUNK lines, each flushed like CompressionMiddleware does) with
+every available codec (gzip always; brotli and zstd when installed) at several levels.
+
+Usage:
+    python -m benchmarks.compression_levels --documents 1000
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from app.core.compression import available_codecs
+from app.core.responses import FastJSONResponse
+from app.schemas.document import Document as DocumentSchema
+from app.services.document import STREAM_LINES_PER_CHUNK
+
+LEVELS: Dict[str, Tuple[int, ...]] = {
+    "gzip": (1, 3, 6, 9),
+    "br": (1, 4, 6, 9, 11),
+    "zstd": (1, 3, 9, 19),
+}
+
+
+def build_payloads(count: int) -> Dict[str, List[bytes]]:
+    now = datetime.now(timezone.utc)
+    documents = [
+        DocumentSchema(
+            id=i, title=f"Carteira de identidade {i}", file_url=f"/api/v1/documents/{i}/content",
+            document_type="RG", owner_id=1, content_type="application/pdf", size=120_000 + i,
+            created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+    lines = [document.model_dump_json().encode() for document in documents]
+    ndjson = [
+        b"\n".join(lines[start:start + STREAM_LINES_PER_CHUNK]) + b"\n"
+        for start in range(0, len(lines), STREAM_LINES_PER_CHUNK)
+    ]
+    return {"json page": [FastJSONResponse(documents).body], "ndjson stream": ndjson}
+
+
+def compress(codec: type, level: int, chunks: List[bytes]) -> bytes:
+    compressor = codec(level)
+    return b"".join(compressor.compress(chunk) for chunk in chunks) + compressor.finish()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    codecs = available_codecs()
+    missing = sorted(set(LEVELS) - set(codecs))
+    if missing:
+        print(f"not installed, skipped: {', '.join(missing)}")
+
+    for name, chunks in build_payloads(args.documents).items():
+        original = sum(map(len, chunks))
+        print(f"\n{name}: {args.documents} documents, {original / 1024:.1f} KiB")
+        print(f"{'codec':<6} {'level':>5} {'KiB':>8} {'ratio':>7} {'CPU ms':>8} {'MiB/s':>8}")
+        for encoding, codec in codecs.items():
+            for level in LEVELS[encoding]:
+                compressed = compress(codec, level, chunks)
+                start = time.process_time()
+                for _ in range(args.rounds):
+                    compress(codec, level, chunks)
+                cpu = (time.process_time() - start) / args.rounds
+                print(
+                    f"{encoding:<6} {level:>5} {len(compressed) / 1024:>8.1f} {original / len(compressed):>6.1f}x"
+                    f" {cpu * 1000:>8.2f} {original / cpu / 2**20:>8.0f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
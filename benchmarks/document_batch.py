@@ -0,0 +1,68 @@
+"""
+Throughput benchmark of document creation: POST /documents/ once per document versus
+POST /documents/batch with up to MAX_DOCUMENTS_PER_BATCH documents per call.
+
+Runs the app in-process against an in-memory SQLite database.
+
+Usage:
+    python -m benchmarks.document_batch --documents 2000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.session import get_db
+from app.main import app
+from app.models.user import User as UserModel
+from app.schemas.document import MAX_DOCUMENTS_PER_BATCH
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel), [{"id": 1, "email": "importer@example.com", "hashed_password": "!"}])
+
+    def override_get_db():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': '1'})}"}
+    documents = [
+        {"title": f"Document {i}", "file_url": f"https://files.example.com/{i}.pdf", "document_type": "Other"}
+        for i in range(args.documents)
+    ]
+
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        for document in documents:
+            assert client.post("/api/v1/documents/", json=document, headers=headers).status_code == 201
+        single_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for offset in range(0, len(documents), MAX_DOCUMENTS_PER_BATCH):
+            batch = documents[offset:offset + MAX_DOCUMENTS_PER_BATCH]
+            assert client.post("/api/v1/documents/batch", json=batch, headers=headers).status_code == 201
+        batch_seconds = time.perf_counter() - start
+
+    print(f"{'route':<8} {'seconds':>10} {'rows/s':>12}")
+    print(f"{'single':<8} {single_seconds:>10.3f} {args.documents / single_seconds:>12.1f}")
+    print(f"{'batch':<8} {batch_seconds:>10.3f} {args.documents / batch_seconds:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Microbenchmark of the response path of document lists.
+
+Compares what FastAPI does with a returned list of schemas (validate it again against
+`response_model`, jsonable_encoder, stdlib json) with returning a FastJSONResponse
+(pydantic-core to_json on the already validated schemas), for lists of 10, 100 and
+1000 documents.
+
+Usage:
+    python -m benchmarks.json_responses --rounds 200
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.responses import FastJSONResponse
+from app.schemas.document import Document as DocumentSchema
+
+SIZES = (10, 100, 1000)
+
+
+def build_documents(count: int) -> List[DocumentSchema]:
+    now = datetime.now(timezone.utc)
+    return [
+        DocumentSchema(
+            id=i, title=f"Documento {i}", file_url=f"https://files.example.com/{i}.pdf",
+            document_type="RG", owner_id=1, created_at=now, updated_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def default_render(field, documents: List[DocumentSchema]) -> bytes:
+    content = await serialize_response(field=field, response_content=documents)
+    return JSONResponse(content).body
+
+
+def fast_render(documents: List[DocumentSchema]) -> bytes:
+    return FastJSONResponse(documents).body
+
+
+async def run(rounds: int) -> None:
+    field = create_model_field(name="Response", type_=List[DocumentSchema], mode="serialization")
+
+    print(f"{'items':>6} {'default (ms)':>14} {'fast (ms)':>11} {'speedup':>8}")
+    for size in SIZES:
+        documents = build_documents(size)
+        assert await default_render(field, documents) == fast_render(documents)
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await default_render(field, documents)
+        default_ms = (time.perf_counter() - start) / rounds * 1000
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fast_render(documents)
+        fast_ms = (time.perf_counter() - start) / rounds * 1000
+
+        print(f"{size:>6} {default_ms:>14.3f} {fast_ms:>11.3f} {default_ms / fast_ms:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark of a returning user's OAuth find-or-create.
+
+Compares the previous flow, which hashed a bcrypt placeholder password before looking
+the user up, with the lookup-first flow of UserService.find_or_create_oauth_user.
+
+Usage:
+    python -m benchmarks.oauth_login --iterations 50
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.hashing import get_password_hash
+from app.db.base import Base
+from app.repos.user import UserRepository
+from app.services.user import UserService
+
+EMAIL = "returning@example.com"
+
+
+def measure(fn: Callable[[], object], iterations: int) -> List[float]:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default="sqlite://")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url, poolclass=StaticPool, connect_args={"check_same_thread": False} if args.database_url.startswith("sqlite") else {})
+    Base.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        repo = UserRepository(session)
+        service = UserService(repo)
+        service.find_or_create_oauth_user(EMAIL, full_name="Returning User")
+
+        def placeholder_hash_first():
+            get_password_hash("oauth-placeholder-password-very-long-and-random-" + EMAIL)
+            repo.get_by_email(EMAIL)
+
+        def lookup_first():
+            service.find_or_create_oauth_user(EMAIL)
+
+        before = measure(placeholder_hash_first, args.iterations)
+        after = measure(lookup_first, args.iterations)
+
+    print(f"{'flow':<24} {'p50_ms':>10} {'p95_ms':>10}")
+    for name, timings in (("placeholder hash first", before), ("lookup first", after)):
+        p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+        print(f"{name:<24} {statistics.median(timings):>10.3f} {p95:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Throughput benchmark of transport recharges: one POST /transport/recharge/ per pass
+versus a single POST /transport/recharge/batch.
+
+Runs the app in-process against an in-memory SQLite database.
+
+Usage:
+    python -m benchmarks.transport_batch --passes 2000
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.db.session import get_db
+from app.main import app
+from app.models.user import User as UserModel
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passes", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(UserModel), [
+            {"id": i, "email": f"rider{i}@example.com", "hashed_password": "!", "is_superuser": i == 1}
+            for i in range(1, args.passes + 1)
+        ])
+
+    def override_get_db():
+        with Session(engine) as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    tokens = {i: f"Bearer {create_access_token({'sub': str(i)})}" for i in range(1, args.passes + 1)}
+
+    with TestClient(app) as client:
+        start = time.perf_counter()
+        for user_id, token in tokens.items():
+            response = client.post("/api/v1/transport/recharge/", json={"amount": 10.0}, headers={"Authorization": token})
+            assert response.status_code == 200
+        single_seconds = time.perf_counter() - start
+
+        batch = {"items": [{"user_id": user_id, "amount": 10.0} for user_id in tokens]}
+        start = time.perf_counter()
+        response = client.post("/api/v1/transport/recharge/batch", json=batch, headers={"Authorization": tokens[1]})
+        assert response.status_code == 200
+        batch_seconds = time.perf_counter() - start
+
+    print(f"{'mode':<8} {'seconds':>10} {'passes/s':>12}")
+    print(f"{'single':<8} {single_seconds:>10.3f} {args.passes / single_seconds:>12.1f}")
+    print(f"{'batch':<8} {batch_seconds:>10.3f} {args.passes / batch_seconds:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.db.base_class import Base
+from app.db.session import get_async_db
+from app.routes import auth, documents, users
+from app.storage import LocalStorage
+
+
+@pytest.fixture(scope="module")
+def async_client() -> TestClient:
+    """
+    Fixture for a client of the async routers (module scope), backed by an
+    in-memory aiosqlite database.
+    """
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with session_factory() as session:
+            yield session
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    app = FastAPI()
+    app.include_router(auth.async_router, prefix="/api/v1/auth")
+    app.include_router(users.async_router, prefix="/api/v1/users")
+    app.include_router(documents.async_router, prefix="/api/v1/documents")
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    with TestClient(app) as c:
+        # aiosqlite connections belong to the loop of the client portal
+        c.portal.call(create_tables)
+        yield c
+        c.portal.call(engine.dispose)
+
+
+@pytest.fixture(scope="module")
+def async_auth_token(async_client: TestClient) -> str:
+    user_data = {"email": "asyncuser@example.com", "password": "asyncpassword", "full_name": "Async User"}
+    response = async_client.post("/api/v1/users/", json=user_data)
+    assert response.status_code == 201
+
+    response = async_client.post("/api/v1/auth/login", json={"email": user_data["email"], "password": user_data["password"]})
+    assert response.status_code == 200
+    return f"Bearer {response.json()['access_token']}"
+
+
+def test_async_create_user_duplicate_email(async_client: TestClient, async_auth_token: str):
+    response = async_client.post("/api/v1/users/", json={"email": "asyncuser@example.com", "password": "other"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+
+def test_async_login_invalid_password(async_client: TestClient, async_auth_token: str):
+    response = async_client.post("/api/v1/auth/login", json={"email": "asyncuser@example.com", "password": "wrong"})
+
+    assert response.status_code == 401
+
+
+def test_async_documents_flow(async_client: TestClient, async_auth_token: str):
+    """
+    Creates, pages through, streams and fetches documents through the async stack.
+    """
+    headers = {"Authorization": async_auth_token}
+    created = []
+    for i in range(3):
+        response = async_client.post(
+            "/api/v1/documents/",
+            json={"title": f"Async Doc {i}", "file_url": f"http://example.com/{i}.pdf"},
+            headers=headers,
+        )
+        assert response.status_code == 201
+        created.append(response.json())
+
+    response = async_client.get("/api/v1/documents/", params={"limit": 2}, headers=headers)
+    assert response.status_code == 200
+    assert [doc["title"] for doc in response.json()] == ["Async Doc 0", "Async Doc 1"]
+
+    response = async_client.get(
+        "/api/v1/documents/",
+        params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]},
+        headers=headers,
+    )
+    assert [doc["title"] for doc in response.json()] == ["Async Doc 2"]
+    assert "X-Next-Cursor" not in response.headers
+
+    response = async_client.get("/api/v1/documents/", params={"stream": True}, headers=headers)
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 3
+
+    response = async_client.get(f"/api/v1/documents/{created[0]['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Async Doc 0"
+
+    response = async_client.get("/api/v1/documents/9999", headers=headers)
+    assert response.status_code == 404
+
+
+def test_async_documents_conditional_get(async_client: TestClient, async_auth_token: str):
+    headers = {"Authorization": async_auth_token}
+    created = async_client.post("/api/v1/documents/", json={"title": "Async Polled", "file_url": "http://example.com/p.pdf"}, headers=headers).json()
+
+    for url in (f"/api/v1/documents/{created['id']}", "/api/v1/documents/"):
+        etag = async_client.get(url, headers=headers).headers["etag"]
+        response = async_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304
+
+
+def test_async_documents_batch(async_client: TestClient, async_auth_token: str):
+    documents_data = [{"title": f"Async Batch {i}", "file_url": f"http://example.com/b{i}.pdf"} for i in range(2)]
+
+    response = async_client.post("/api/v1/documents/batch", json=documents_data, headers={"Authorization": async_auth_token})
+
+    assert response.status_code == 201
+    assert [doc["title"] for doc in response.json()] == ["Async Batch 0", "Async Batch 1"]
+
+
+def test_async_documents_upload_and_download(async_client: TestClient, async_auth_token: str, tmp_path):
+    storage = LocalStorage(str(tmp_path))
+    async_client.app.dependency_overrides[documents.get_storage] = lambda: storage
+    headers = {"Authorization": async_auth_token}
+    try:
+        response = async_client.post(
+            "/api/v1/documents/upload", params={"title": "Async Upload"}, content=b"%PDF-1.7 async",
+            headers={**headers, "Content-Type": "application/pdf"},
+        )
+        assert response.status_code == 201
+        file_url = response.json()["file_url"]
+
+        response = async_client.get(file_url, headers={**headers, "Range": "bytes=0-3"})
+        assert response.status_code == 206
+        assert response.content == b"%PDF"
+    finally:
+        async_client.app.dependency_overrides.pop(documents.get_storage, None)
+
+
+def test_async_documents_unauthorized(async_client: TestClient):
+    response = async_client.get("/api/v1/documents/")
+
+    assert response.status_code == 401
+
+def test_async_logout_revokes_the_token(async_client: TestClient, async_auth_token: str):
+    response = async_client.post("/api/v1/auth/login", json={"email": "asyncuser@example.com", "password": "asyncpassword"})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    assert async_client.post("/api/v1/auth/logout", headers=headers).status_code == 204
+    assert async_client.get("/api/v1/documents/", headers=headers).status_code == 401
+    # Other tokens of the user are still valid
+    assert async_client.get("/api/v1/documents/", headers={"Authorization": async_auth_token}).status_code == 200
+
+def test_async_refresh_token_rotation(async_client: TestClient, async_auth_token: str):
+    response = async_client.post("/api/v1/auth/login", json={"email": "asyncuser@example.com", "password": "asyncpassword"})
+    refresh_token = response.json()["refresh_token"]
+
+    response = async_client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert async_client.get("/api/v1/documents/", headers=headers).status_code == 200
+
+    response = async_client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
@@ -1,9 +1,18 @@
 import pytest
+import time
+from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
 from app.schemas.user import Token, LoginRequest
 from app.models.user import User as UserModel
+from app.services.user import UserService
+from app.repos.user import UserRepository
+from app.core.hashing import password_hashing_pool, UNUSABLE_PASSWORD
+from app.core.revocation import BloomFilter, revocation_list, sync_revocation_list
+from app.core.security import create_access_token, decode_access_token
+from app.models.token import RefreshToken, RevokedToken
+from app.repos.token import RevokedTokenRepository
 
 
 def test_login_successful(client: TestClient, db: Session, test_user: UserModel):
@@ -32,3 +41,169 @@ def test_login_invalid_input(client: TestClient):
     response = client.post("/api/v1/auth/login", json={})
 
     assert response.status_code == 422
+
+def test_login_hashing_pool_saturated(client: TestClient, db: Session, test_user: UserModel, monkeypatch):
+    monkeypatch.setattr(password_hashing_pool, "max_pending", 0)
+
+    login_data = LoginRequest(email=test_user.email, password="testpassword")
+    response = client.post("/api/v1/auth/login", json=login_data.model_dump())
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_authenticated_requests_reuse_verified_token(client: TestClient, db: Session, test_user: UserModel, monkeypatch):
+    """
+    Repeated requests with the same token are served from the verified-token cache,
+    and changing the user forces a new lookup (tokens with only the user id).
+    """
+    user_auth_token = f"Bearer {create_access_token({'sub': str(test_user.id)})}"
+    lookups = []
+    original_get_user_by_id = UserService.get_user_by_id
+
+    def counting_get_user_by_id(self, user_id: int):
+        lookups.append(user_id)
+        return original_get_user_by_id(self, user_id)
+
+    monkeypatch.setattr(UserService, "get_user_by_id", counting_get_user_by_id)
+
+    for _ in range(3):
+        response = client.get("/api/v1/documents/", headers={"Authorization": user_auth_token})
+        assert response.status_code == 200
+    assert len(lookups) == 1
+
+    user = db.query(UserModel).filter(UserModel.email == "testuser@example.com").first()
+    user.full_name = "Renamed User"
+    db.flush()
+
+    response = client.get("/api/v1/documents/", headers={"Authorization": user_auth_token})
+    assert response.status_code == 200
+    assert len(lookups) == 2
+
+
+def test_find_or_create_oauth_user(client: TestClient, db: Session):
+    """
+    OAuth users are created once with an unusable password and found on later logins.
+    """
+    user_service = UserService(UserRepository(db))
+
+    created = user_service.find_or_create_oauth_user("oauth@example.com", full_name="OAuth User")
+    assert created.hashed_password == UNUSABLE_PASSWORD
+    assert created.full_name == "OAuth User"
+
+    found = user_service.find_or_create_oauth_user("oauth@example.com")
+    assert found.id == created.id
+    assert db.query(UserModel).filter(UserModel.email == "oauth@example.com").count() == 1
+
+    login_data = LoginRequest(email="oauth@example.com", password=UNUSABLE_PASSWORD)
+    response = client.post("/api/v1/auth/login", json=login_data.model_dump())
+    assert response.status_code == 401
+
+
+def test_logout_revokes_the_token(client: TestClient, db: Session, user_auth_token: str):
+    headers = {"Authorization": user_auth_token}
+    assert decode_access_token(user_auth_token.split()[1])["jti"]
+
+    # Served from the verified-token cache before the logout
+    assert client.get("/api/v1/documents/", headers=headers).status_code == 200
+
+    response = client.post("/api/v1/auth/logout", headers=headers)
+    assert response.status_code == 204
+    assert db.query(RevokedToken).count() == 1
+
+    assert client.get("/api/v1/documents/", headers=headers).status_code == 401
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 401
+
+def test_revocations_of_other_workers_are_synced(client: TestClient, db: Session, user_auth_token: str, test_user: UserModel):
+    """
+    Tokens revoked by another worker are rejected after a sync, even when committed after
+    rows with higher ids; expired revocations are pruned from memory and from the table.
+    """
+    headers = {"Authorization": user_auth_token}
+    jti = decode_access_token(user_auth_token.split()[1])["jti"]
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        RevokedToken(id=10, jti=jti, user_id=test_user.id, expires_at=now + timedelta(hours=1)),
+        RevokedToken(id=11, jti="expired", user_id=test_user.id, expires_at=now - timedelta(hours=1)),
+    ])
+    db.flush()
+    revocation_list.add("pruned", time.time() - 1)
+
+    assert client.get("/api/v1/documents/", headers=headers).status_code == 200
+    sync_revocation_list(RevokedTokenRepository(db))
+
+    assert client.get("/api/v1/documents/", headers=headers).status_code == 401
+    assert len(revocation_list) == 1
+    assert [token.jti for token in db.query(RevokedToken)] == [jti]
+
+    db.add(RevokedToken(id=5, jti="late", user_id=test_user.id, expires_at=now + timedelta(hours=1)))
+    db.flush()
+    sync_revocation_list(RevokedTokenRepository(db))
+    assert revocation_list.is_revoked("late")
+
+def test_bloom_filter():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    added = [f"added-{i}" for i in range(1000)]
+    for key in added:
+        bloom.add(key)
+
+    assert all(key in bloom for key in added)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_access_token_claims_need_no_user_lookup(client: TestClient, db: Session, user_auth_token: str, test_user: UserModel, monkeypatch):
+    def failing_get_user_by_id(self, user_id: int):
+        raise AssertionError("the user should come from the token")
+
+    monkeypatch.setattr(UserService, "get_user_by_id", failing_get_user_by_id)
+
+    claims = decode_access_token(user_auth_token.split()[1])
+    assert claims["sub"] == str(test_user.id)
+    assert claims["email"] == test_user.email
+    assert claims["is_superuser"] is False
+    assert claims["exp"] - time.time() <= 15 * 60
+
+    response = client.get("/api/v1/documents/", headers={"Authorization": user_auth_token})
+    assert response.status_code == 200
+
+def test_refresh_token_rotation(client: TestClient, db: Session, test_user: UserModel):
+    response = client.post("/api/v1/auth/login", json={"email": test_user.email, "password": "testpassword"})
+    first = response.json()
+    assert first["expires_in"] == 15 * 60
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    assert response.status_code == 200
+    second = response.json()
+    assert second["refresh_token"] != first["refresh_token"]
+    assert client.get("/api/v1/documents/", headers={"Authorization": f"Bearer {second['access_token']}"}).status_code == 200
+
+    # The first refresh token was already used: presenting it again revokes the whole family
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    assert response.status_code == 401
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": second["refresh_token"]})
+    assert response.status_code == 401
+    assert db.query(RefreshToken).filter(RefreshToken.revoked.is_(False)).count() == 0
+
+def test_refresh_unknown_or_expired_token(client: TestClient, db: Session, test_user: UserModel):
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": "unknown"})
+    assert response.status_code == 401
+
+    response = client.post("/api/v1/auth/login", json={"email": test_user.email, "password": "testpassword"})
+    refresh_token = response.json()["refresh_token"]
+    db.query(RefreshToken).update({"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.flush()
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+
+def test_refresh_rejects_deactivated_user(client: TestClient, db: Session, test_user: UserModel):
+    response = client.post("/api/v1/auth/login", json={"email": test_user.email, "password": "testpassword"})
+    refresh_token = response.json()["refresh_token"]
+    test_user.is_active = False
+    db.flush()
+
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+    assert db.query(RefreshToken).count() == 1
+
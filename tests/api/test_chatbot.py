@@ -2,6 +2,9 @@ import pytest
 from fastapi.testclient import TestClient
 
 from app.schemas.chatbot import ChatbotRequest, ChatbotResponse
+from app.routes.chatbot import get_chatbot_service
+from app.services.chatbot import ChatbotService
+from app.core.cache import InMemorySharedCache
 
 
 def test_ask_chatbot_successful_keyword_balance(client: TestClient):
@@ -84,6 +87,68 @@ def test_ask_chatbot_successful_no_keyword(client: TestClient):
     assert "Desculpe, não entendi sua pergunta" in response_data["answer"]
 
 
+def test_ask_chatbot_accent_insensitive(client: TestClient):
+    """
+    Testa se as palavras-chave são reconhecidas sem acentos e em maiúsculas.
+    """
+    question_data = ChatbotRequest(question="QUAIS SERVICOS A PREFEITURA OFERECE?")
+
+    response = client.post(
+        "/api/v1/chatbot/",
+        json=question_data.model_dump()
+    )
+
+    assert response.status_code == 200
+    assert "serviços da prefeitura" in response.json()["answer"]
+
+
+def test_ask_chatbot_priority_order(client: TestClient):
+    """
+    Testa que, com várias palavras-chave na pergunta, vale a primeira entrada do mapa.
+    """
+    question_data = ChatbotRequest(question="Olá, qual o saldo do meu documento?")
+
+    response = client.post(
+        "/api/v1/chatbot/",
+        json=question_data.model_dump()
+    )
+
+    assert response.status_code == 200
+    assert "saldo de transporte" in response.json()["answer"]
+
+
+def test_ask_chatbot_repeated_question_is_cached(client: TestClient):
+    """
+    Testa que perguntas repetidas (mesmo normalizadas) são respondidas pelo cache do serviço.
+    """
+    before = get_chatbot_service().stats()
+
+    for question in ("Saldo transporte", "  saldo   TRANSPORTE "):
+        response = client.post("/api/v1/chatbot/", json={"question": question})
+        assert response.status_code == 200
+        assert "saldo de transporte" in response.json()["answer"]
+
+    after = get_chatbot_service().stats()
+    assert after["hits"] - before["hits"] >= 1
+    assert after["misses"] - before["misses"] <= 1
+
+
+def test_chatbot_shared_cache_between_services():
+    """
+    Testa que duas instâncias (como dois workers) reaproveitam respostas pelo cache compartilhado.
+    """
+    shared_cache = InMemorySharedCache()
+    first_worker = ChatbotService(shared_cache=shared_cache)
+    second_worker = ChatbotService(shared_cache=shared_cache)
+
+    answer = first_worker.get_chatbot_response("Preciso de ajuda")
+    assert second_worker.get_chatbot_response("preciso de ajuda") == answer
+
+    assert first_worker.stats()["misses"] == 1
+    assert second_worker.stats()["shared_hits"] == 1
+    assert second_worker.stats()["misses"] == 0
+
+
 def test_ask_chatbot_invalid_input(client: TestClient):
     """
     Testa a tentativa de enviar uma requisição com dados inválidos (ex: sem o campo 'question').
@@ -95,3 +160,23 @@ def test_ask_chatbot_invalid_input(client: TestClient):
     )
 
     assert response.status_code == 422
+
+
+def test_chatbot_websocket_multi_turn(client: TestClient):
+    """
+    Testa várias perguntas na mesma conexão WebSocket, que sobrevive a mensagens inválidas.
+    """
+    with client.websocket_connect("/api/v1/chatbot/ws") as websocket:
+        for question, expected in (("Qual o meu saldo?", "saldo de transporte"), ("Olá", "carteira digital municipal")):
+            websocket.send_json({"question": question})
+            message = websocket.receive_json()
+
+            assert message["type"] == "answer"
+            assert expected in message["answer"]
+
+        websocket.send_json({})
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_bytes(b'{"question": "bytes"}')
+        assert websocket.receive_json()["type"] == "error"
+        websocket.send_json({"question": "Olá"})
+        assert websocket.receive_json()["type"] == "answer"
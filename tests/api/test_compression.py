@@ -0,0 +1,130 @@
+import gzip
+import zlib
+
+import anyio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from starlette.responses import PlainTextResponse, StreamingResponse
+
+from app.core.compression import BrotliCompressor, CompressionMiddleware, GzipCompressor, ZstdCompressor, choose_encoding
+from app.models.document import Document as DocumentModel
+from app.models.user import User as UserModel
+
+
+def create_documents(db: Session, owner_id: int, count: int):
+    db.add_all(
+        DocumentModel(title=f"Carteira de identidade {i}", file_url=f"https://files.example.com/{i}.pdf", document_type="RG", owner_id=owner_id)
+        for i in range(count)
+    )
+    db.flush()
+
+
+def test_choose_encoding():
+    supported = ["zstd", "br", "gzip"]
+
+    assert choose_encoding("gzip, deflate, br", supported) == "br"
+    assert choose_encoding("gzip;q=1.0, br;q=0.5", supported) == "gzip"
+    assert choose_encoding("br;q=0, gzip", supported) == "gzip"
+    assert choose_encoding("*", ["gzip"]) == "gzip"
+    assert choose_encoding("identity", supported) is None
+    assert choose_encoding("", supported) is None
+
+
+def test_list_documents_compressed(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str):
+    """
+    Test that a large document list is gzipped and a small response is not.
+    """
+    create_documents(db, test_user.id, 50)
+    headers = {"Authorization": user_auth_token, "Accept-Encoding": "gzip"}
+
+    response = client.get("/api/v1/documents/", headers=headers)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()) == 50
+
+    response = client.get("/api/v1/documents/", params={"limit": 1}, headers=headers)
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/api/v1/documents/", headers={**headers, "Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+def test_stream_documents_compressed(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str):
+    """
+    Test that the NDJSON export is compressed while streaming.
+    """
+    create_documents(db, test_user.id, 250)
+
+    response = client.get(
+        "/api/v1/documents/", params={"stream": "true"},
+        headers={"Authorization": user_auth_token, "Accept-Encoding": "gzip"},
+    )
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.text.splitlines()) == 250
+
+
+def test_compression_flushes_every_chunk():
+    """
+    Test that each chunk of a stream can be decompressed as soon as it is received.
+    """
+    chunks = [b'{"line": %d}\n' % i * 100 for i in range(3)]
+
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    app = CompressionMiddleware(StreamingResponse(stream(), media_type="application/x-ndjson"), minimum_size=10)
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "method": "GET", "headers": [(b"accept-encoding", b"gzip")]}
+    anyio.run(app, scope, receive, send)
+
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    bodies = [message["body"] for message in messages if message["type"] == "http.response.body"]
+    for chunk, body in zip(chunks, bodies):
+        assert decompressor.decompress(body) == chunk
+    assert gzip.decompress(b"".join(bodies)) == b"".join(chunks)
+
+
+@pytest.mark.parametrize("media_type", ["application/pdf", "text/event-stream"])
+def test_uncompressible_responses_pass_through(media_type):
+    app = CompressionMiddleware(PlainTextResponse("x" * 5000, media_type=media_type))
+
+    response = TestClient(app).get("/", headers={"Accept-Encoding": "gzip"})
+
+    assert "content-encoding" not in response.headers
+    assert response.text == "x" * 5000
+
+
+def assert_streaming_round_trip(compressor, decompress):
+    chunks = [b'{"id": 1, "title": "Carteira de identidade"}\n' * 20, b'{"id": 2, "title": "CPF"}\n' * 20]
+    # Every chunk is flushed: it decompresses on its own, before the stream ends
+    for chunk in chunks:
+        assert decompress(compressor.compress(chunk)) == chunk
+    assert decompress(compressor.finish()) == b""
+
+
+def test_gzip_compressor_round_trip():
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    assert_streaming_round_trip(GzipCompressor(6), decompressor.decompress)
+
+
+def test_brotli_compressor_round_trip():
+    brotli = pytest.importorskip("brotli")
+    decompressor = brotli.Decompressor()
+    assert_streaming_round_trip(BrotliCompressor(4), decompressor.process)
+
+
+def test_zstd_compressor_round_trip():
+    zstandard = pytest.importorskip("zstandard")
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    assert_streaming_round_trip(ZstdCompressor(3), decompressor.decompress)
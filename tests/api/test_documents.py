@@ -1,10 +1,22 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+import anyio
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from app.schemas.document import DocumentCreate, Document as DocumentResponseSchema
-from app.models.document import Document as DocumentModel
+from app.schemas.document import DocumentCreate, Document as DocumentResponseSchema, MAX_DOCUMENTS_PER_BATCH
+from app.models.document import Document as DocumentModel, DocumentBlob
 from app.models.user import User as UserModel
+from app.core.config import settings
+from app.main import app
+from app.repos.document import DocumentRepository
+from app.routes.documents import get_storage
+from app.storage import LocalObjectStoreClient, ObjectStorage
+from app.core.responses import FastJSONResponse
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 
 
 def create_test_document(db: Session, owner_id: int, title: str = "Test Document", file_url: str = "http://example.com/doc.pdf", document_type: str = "Other") -> DocumentModel:
@@ -72,6 +84,48 @@ def test_create_document_unauthorized(client: TestClient, db: Session):
     assert response.status_code == 401
 
 
+def test_create_documents_batch_successful(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str):
+    """
+    Test creating several documents in a single batch request.
+    """
+    documents_data = [
+        DocumentCreate(title=f"Batch Doc {i}", file_url=f"http://example.com/batch{i}.pdf", document_type="Other").model_dump()
+        for i in range(3)
+    ]
+
+    response = client.post(
+        "/api/v1/documents/batch",
+        json=documents_data,
+        headers={"Authorization": user_auth_token}
+    )
+
+    assert response.status_code == 201
+    response_data = response.json()
+    assert [doc["title"] for doc in response_data] == [f"Batch Doc {i}" for i in range(3)]
+    assert all(doc["owner_id"] == test_user.id for doc in response_data)
+    assert all(doc["created_at"] for doc in response_data)
+
+    ids = [doc["id"] for doc in response_data]
+    assert db.query(DocumentModel).filter(DocumentModel.id.in_(ids)).count() == 3
+
+
+def test_create_documents_batch_limits(client: TestClient, user_auth_token: str):
+    """
+    Test that empty and oversized batches are rejected with 422.
+    """
+    document = {"title": "Doc", "file_url": "http://example.com/doc.pdf"}
+
+    response = client.post("/api/v1/documents/batch", json=[], headers={"Authorization": user_auth_token})
+    assert response.status_code == 422
+
+    response = client.post(
+        "/api/v1/documents/batch",
+        json=[document] * (MAX_DOCUMENTS_PER_BATCH + 1),
+        headers={"Authorization": user_auth_token}
+    )
+    assert response.status_code == 422
+
+
 def test_list_documents_successful(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str):
     """
     Test listing documents for the authenticated user.
@@ -135,6 +189,72 @@ def test_list_documents_empty(client: TestClient, db: Session, user_auth_token:
     assert len(response_data) == 0
 
 
+def test_list_documents_paginated(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str):
+    """
+    Test walking through the documents of the authenticated user with keyset cursors.
+    """
+    for i in range(5):
+        create_test_document(db, test_user.id, title=f"Paged Doc {i}")
+
+    response = client.get(
+        "/api/v1/documents/",
+        params={"limit": 2},
+        headers={"Authorization": user_auth_token}
+    )
+    assert response.status_code == 200
+    titles = [doc["title"] for doc in response.json()]
+    assert titles == ["Paged Doc 0", "Paged Doc 1"]
+
+    seen = list(titles)
+    cursor = response.headers.get("X-Next-Cursor")
+    while cursor:
+        response = client.get(
+            "/api/v1/documents/",
+            params={"limit": 2, "cursor": cursor},
+            headers={"Authorization": user_auth_token}
+        )
+        assert response.status_code == 200
+        seen.extend(doc["title"] for doc in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+
+    assert seen == [f"Paged Doc {i}" for i in range(5)]
+
+
+def test_list_documents_invalid_cursor(client: TestClient, user_auth_token: str):
+    """
+    Test that a malformed cursor is rejected with 400 Bad Request.
+    """
+    response = client.get(
+        "/api/v1/documents/",
+        params={"cursor": "not-a-cursor"},
+        headers={"Authorization": user_auth_token}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_list_documents_stream_ndjson(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str):
+    """
+    Test streaming every document of the authenticated user as NDJSON.
+    """
+    for i in range(3):
+        create_test_document(db, test_user.id, title=f"Streamed Doc {i}")
+
+    response = client.get(
+        "/api/v1/documents/",
+        params={"stream": True},
+        headers={"Authorization": user_auth_token}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [doc["title"] for doc in lines] == [f"Streamed Doc {i}" for i in range(3)]
+    assert all(doc["owner_id"] == test_user.id for doc in lines)
+
+
 def test_get_document_by_id_successful(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str):
     """
     Test getting a specific document by ID for the owner.
@@ -154,6 +274,63 @@ def test_get_document_by_id_successful(client: TestClient, db: Session, test_use
     assert response_data["owner_id"] == test_user.id
 
 
+def test_get_document_conditional(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str):
+    """
+    Test ETag / Last-Modified on a document and the 304 answers to conditional GETs.
+    """
+    test_doc = create_test_document(db, test_user.id, title="Polled Doc")
+    url = f"/api/v1/documents/{test_doc.id}"
+    headers = {"Authorization": user_auth_token}
+
+    response = client.get(url, headers=headers)
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = client.get(url, headers={**headers, "If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    test_doc.title = "Polled Doc (edited)"
+    test_doc.updated_at = datetime.now(timezone.utc) + timedelta(minutes=1)
+    db.flush()
+
+    response = client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Polled Doc (edited)"
+    assert response.headers["etag"] != etag
+
+    response = client.get(url, headers={**headers, "If-Modified-Since": last_modified})
+    assert response.status_code == 200
+
+
+def test_list_documents_conditional(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str, monkeypatch):
+    """
+    Test that an unchanged page answers 304 without loading the documents, and changes with the collection.
+    """
+    for i in range(3):
+        create_test_document(db, test_user.id, title=f"Listed Doc {i}")
+    headers = {"Authorization": user_auth_token}
+
+    response = client.get("/api/v1/documents/", params={"limit": 2}, headers=headers)
+    etag = response.headers["etag"]
+    assert client.get("/api/v1/documents/", params={"limit": 3}, headers=headers).headers["etag"] != etag
+
+    def fail_page(*args, **kwargs):
+        raise AssertionError("a 304 must not load the page")
+    with monkeypatch.context() as patch:
+        patch.setattr(DocumentRepository, "get_documents_page_by_owner", fail_page)
+        response = client.get("/api/v1/documents/", params={"limit": 2}, headers={**headers, "If-None-Match": f'"x", {etag}'})
+    assert response.status_code == 304
+
+    create_test_document(db, test_user.id, title="Listed Doc 3")
+    response = client.get("/api/v1/documents/", params={"limit": 2}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
 def test_get_document_by_id_not_found(client: TestClient, user_auth_token: str):
     """
     Test getting a non-existent document by ID for the authenticated user.
@@ -204,3 +381,201 @@ def test_get_document_by_id_unauthorized_no_auth(client: TestClient, db: Session
     )
 
     assert response.status_code == 401
+
+
+def upload_test_file(client: TestClient, token: str, content: bytes, title: str = "Scanned ID", content_type: str = "application/pdf", sha256: str = None):
+    headers = {"Authorization": token, "Content-Type": content_type}
+    if sha256:
+        headers["X-Content-SHA256"] = sha256
+    return client.post(
+        "/api/v1/documents/upload",
+        params={"title": title, "document_type": "RG"},
+        content=content,
+        headers=headers,
+    )
+
+def test_upload_and_download_document(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str, local_storage):
+    """
+    Test uploading a file and downloading it back, whole and by range.
+    """
+    content = bytes(range(256)) * 1024
+
+    response = upload_test_file(client, user_auth_token, content)
+
+    assert response.status_code == 201
+    document = response.json()
+    assert document["size"] == len(content)
+    assert document["content_type"] == "application/pdf"
+    assert document["owner_id"] == test_user.id
+    assert document["file_url"] == f"/api/v1/documents/{document['id']}/content"
+
+    response = client.get(document["file_url"], headers={"Authorization": user_auth_token})
+    assert response.status_code == 200
+    assert response.content == content
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["accept-ranges"] == "bytes"
+
+    response = client.get(document["file_url"], headers={"Authorization": user_auth_token, "Range": "bytes=1000-1999"})
+    assert response.status_code == 206
+    assert response.content == content[1000:2000]
+    assert response.headers["content-range"] == f"bytes 1000-1999/{len(content)}"
+
+
+def test_upload_identical_files_share_one_blob(client: TestClient, db: Session, user_auth_token: str, local_storage):
+    """
+    Test that identical uploads are stored once, keyed by their SHA-256.
+    """
+    content = b"%PDF-1.7 same scan" * 100
+    digest = hashlib.sha256(content).hexdigest()
+
+    first = upload_test_file(client, user_auth_token, content, title="RG")
+    second = upload_test_file(client, user_auth_token, content, title="RG (copy)")
+
+    assert first.status_code == 201 and second.status_code == 201
+    documents = db.query(DocumentModel).filter(DocumentModel.id.in_([first.json()["id"], second.json()["id"]])).all()
+    assert {document.storage_key for document in documents} == {digest}
+    assert db.query(DocumentBlob).count() == 1
+    assert [path.name for path in local_storage.root.rglob("*") if path.is_file()] == [digest]
+
+    response = client.get(second.json()["file_url"], headers={"Authorization": user_auth_token})
+    assert response.content == content
+
+
+def test_upload_with_known_sha256_skips_writing(client: TestClient, db: Session, user_auth_token: str, local_storage, monkeypatch):
+    """
+    Test that an upload announcing the hash of a stored blob is verified but not written again.
+    """
+    content = b"%PDF-1.7 family CPF" * 100
+    digest = hashlib.sha256(content).hexdigest()
+    assert upload_test_file(client, user_auth_token, content, sha256=digest).status_code == 201
+
+    async def fail_save(key, chunks):
+        raise AssertionError("the blob is already stored")
+    monkeypatch.setattr(local_storage, "save", fail_save)
+
+    response = upload_test_file(client, user_auth_token, content, sha256=digest.upper())
+    assert response.status_code == 201
+    assert db.query(DocumentModel).filter_by(storage_key=digest).count() == 2
+
+    # Announcing a stored hash with other bytes must not link to that blob
+    response = upload_test_file(client, user_auth_token, b"something else", sha256=digest)
+    assert response.status_code == 400
+    assert db.query(DocumentModel).filter_by(storage_key=digest).count() == 2
+
+
+def test_upload_document_too_large(client: TestClient, user_auth_token: str, local_storage, monkeypatch):
+    """
+    Test that an upload over MAX_UPLOAD_SIZE_BYTES is rejected and leaves no file behind.
+    """
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE_BYTES", 1024)
+
+    response = upload_test_file(client, user_auth_token, b"x" * 2048)
+
+    assert response.status_code == 413
+    assert not any(path.is_file() for path in local_storage.root.rglob("*"))
+
+
+def test_upload_document_empty(client: TestClient, user_auth_token: str, local_storage):
+    response = upload_test_file(client, user_auth_token, b"")
+
+    assert response.status_code == 400
+
+
+def test_download_document_content_not_found(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str, local_storage):
+    """
+    Test downloading documents without a stored file or owned by someone else.
+    """
+    document = create_test_document(db, owner_id=test_user.id)
+    response = client.get(f"/api/v1/documents/{document.id}/content", headers={"Authorization": user_auth_token})
+    assert response.status_code == 404
+
+    other_user = UserModel(email="other@example.com", hashed_password="hashed", full_name="Other")
+    db.add(other_user)
+    db.flush()
+    other_document = create_test_document(db, owner_id=other_user.id)
+    other_document.storage_key = "abc"
+    db.flush()
+    response = client.get(f"/api/v1/documents/{other_document.id}/content", headers={"Authorization": user_auth_token})
+    assert response.status_code == 404
+
+
+def test_download_document_content_missing_file(client: TestClient, user_auth_token: str, local_storage):
+    """
+    Test that a document whose stored file went away answers 404 instead of failing.
+    """
+    response = upload_test_file(client, user_auth_token, b"%PDF-1.7 lost scan")
+    for path in local_storage.root.rglob("*"):
+        if path.is_file():
+            path.unlink()
+
+    response = client.get(response.json()["file_url"], headers={"Authorization": user_auth_token})
+
+    assert response.status_code == 404
+
+
+def test_upload_and_download_document_object_storage(client: TestClient, user_auth_token: str, tmp_path):
+    """
+    Test the S3 code path (multipart upload, ranged GET) against the local stand-in client.
+    """
+    storage = ObjectStorage(LocalObjectStoreClient(str(tmp_path)), "documents", part_size=4096)
+    app.dependency_overrides[get_storage] = lambda: storage
+    content = bytes(range(256)) * 64
+    try:
+        response = upload_test_file(client, user_auth_token, content)
+        assert response.status_code == 201
+        file_url = response.json()["file_url"]
+
+        response = client.get(file_url, headers={"Authorization": user_auth_token})
+        assert response.status_code == 200
+        assert response.content == content
+
+        response = client.get(file_url, headers={"Authorization": user_auth_token, "Range": "bytes=-100"})
+        assert response.status_code == 206
+        assert response.content == content[-100:]
+        assert response.headers["content-range"] == f"bytes {len(content) - 100}-{len(content) - 1}/{len(content)}"
+
+        response = client.get(file_url, headers={"Authorization": user_auth_token, "Range": f"bytes={len(content)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(content)}"
+    finally:
+        app.dependency_overrides.pop(get_storage, None)
+
+
+def test_object_storage_save_in_parts(tmp_path):
+    """
+    Test that ObjectStorage uploads in parts of `part_size` and aborts a failed upload.
+    """
+    client = LocalObjectStoreClient(str(tmp_path))
+    storage = ObjectStorage(client, "documents", part_size=10)
+
+    async def chunks(fail: bool = False):
+        for _ in range(5):
+            yield b"abcdefg"
+        if fail:
+            raise RuntimeError("client went away")
+
+    async def scenario():
+        size = await storage.save("complete", chunks())
+        data = b"".join([chunk async for chunk in storage.iter_range("complete", 0, size - 1)])
+        with pytest.raises(RuntimeError):
+            await storage.save("failed", chunks(fail=True))
+        return size, data
+
+    size, data = anyio.run(scenario)
+
+    assert size == 35
+    assert data == b"abcdefg" * 5
+    assert not (tmp_path / "documents" / "failed").exists()
+    assert list((tmp_path / "documents" / ".uploads").iterdir()) == []
+
+
+def test_fast_json_response_matches_default_encoding(db: Session, test_user: UserModel):
+    """
+    Test that FastJSONResponse writes the same body FastAPI would for the same schemas.
+    """
+    documents = [
+        DocumentResponseSchema.model_validate(create_test_document(db, test_user.id, title=f"Título {i}", document_type=None))
+        for i in range(3)
+    ]
+
+    assert FastJSONResponse(documents).body == JSONResponse(jsonable_encoder(documents)).body
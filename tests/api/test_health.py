@@ -1,6 +1,9 @@
 
 from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
 from app.main import app
+from app.models.user import User as UserModel
 
 client = TestClient(app)
 
@@ -8,3 +11,19 @@ def test_health_check():
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+def test_pool_health(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str):
+    assert client.get("/health/pool").status_code == 401
+    assert client.get("/health/pool", headers={"Authorization": user_auth_token}).status_code == 403
+
+    test_user.is_superuser = True
+    db.flush()
+    # Access tokens carry is_superuser: log in again to get one with the new role
+    response = client.post("/api/v1/auth/login", json={"email": test_user.email, "password": "testpassword"})
+    response = client.get("/health/pool", headers={"Authorization": f"Bearer {response.json()['access_token']}"})
+    assert response.status_code == 200
+    data = response.json()
+
+    for counter in ("checkouts", "checkins", "timeouts", "wait_seconds_avg", "wait_seconds_max"):
+        assert counter in data
+    assert "pool_class" in data["pools"]["sync"]
@@ -0,0 +1,125 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.metrics import Histogram, MetricsMiddleware, RequestMetrics
+from app.db.session import instrument_queries
+
+
+def metrics_app(metrics: RequestMetrics) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+    return app
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 3.0):
+        histogram.observe(value, ("/a",))
+
+    lines = histogram.render()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'latency_seconds_count{route="/a"} 4' in lines
+
+
+def test_db_queries_counted_per_request():
+    """
+    Test that the engine hooks count the queries of a request, in sync and async routes.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    async_engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    instrument_queries(engine)
+    instrument_queries(async_engine.sync_engine)
+    metrics = RequestMetrics()
+    app = metrics_app(metrics)
+
+    @app.get("/items/{item_id}")
+    def read_item(item_id: int):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 2"))
+        return {"id": item_id}
+
+    @app.get("/async-items")
+    async def read_async_items():
+        async with async_engine.connect() as conn:
+            for _ in range(3):
+                await conn.execute(text("SELECT 1"))
+        return []
+
+    with TestClient(app) as client:
+        response = client.get("/items/1")
+        assert 'desc="2 queries"' in response.headers["server-timing"]
+        client.get("/items/2")
+        response = client.get("/async-items")
+        assert 'desc="3 queries"' in response.headers["server-timing"]
+        client.get("/missing")
+        client.portal.call(async_engine.dispose)
+
+    lines = "\n".join(metrics.render())
+    assert 'http_requests_total{method="GET",route="/items/{item_id}",status="200"} 2' in lines
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in lines
+    assert 'http_request_db_queries_sum{method="GET",route="/items/{item_id}"} 4' in lines
+    assert 'http_request_db_queries_sum{method="GET",route="/async-items"} 3' in lines
+
+
+def test_failed_queries_are_counted():
+    """
+    Test that a statement that raises is counted and leaves no timer on the pooled connection.
+    """
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    instrument_queries(engine)
+    app = metrics_app(RequestMetrics())
+
+    @app.get("/broken")
+    def broken():
+        with engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM nope"))
+            conn.execute(text("SELECT 1"))
+        return {}
+
+    with TestClient(app) as client:
+        response = client.get("/broken")
+
+    assert 'desc="4 queries"' in response.headers["server-timing"]
+    with engine.connect() as conn:
+        assert "query_started_at" not in conn.info
+
+
+def test_metrics_endpoint(client: TestClient, user_auth_token: str, monkeypatch):
+    """
+    Test the Server-Timing header of an authenticated route and the /metrics output.
+    """
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    response = client.get("/api/v1/documents/", headers={"Authorization": user_auth_token})
+
+    server_timing = response.headers["server-timing"]
+    assert server_timing.startswith("app;dur=")
+    assert "auth;dur=" in server_timing
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": user_auth_token}).status_code == 401
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/api/v1/documents/",status="200"}' in response.text
+    assert 'http_request_auth_duration_seconds_count{method="GET",route="/api/v1/documents/"}' in response.text
+    assert "db_pool_checkouts_total" in response.text
+
+
+def test_metrics_endpoint_hidden_without_token(client: TestClient, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", None)
+
+    assert client.get("/metrics", headers={"Authorization": "Bearer "}).status_code == 404
@@ -0,0 +1,29 @@
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.core.hashing import password_hashing_pool
+from app.server import UvloopWorker, default_workers, gunicorn_options, post_fork
+
+
+def test_gunicorn_options():
+    options = gunicorn_options()
+
+    assert options["worker_class"] is UvloopWorker
+    assert UvloopWorker.CONFIG_KWARGS == {"loop": "uvloop", "http": "httptools"}
+    assert options["workers"] == default_workers()
+    assert options["preload_app"] is True
+    assert options["max_requests"] > 0 and options["max_requests_jitter"] > 0
+    assert options["accesslog"] is None
+
+def test_gunicorn_access_log(monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_ACCESS_LOG", True)
+
+    assert gunicorn_options()["accesslog"] == "-"
+
+def test_post_fork_splits_password_hash_workers(monkeypatch):
+    monkeypatch.setattr(password_hashing_pool, "max_workers", password_hashing_pool.max_workers)
+    server = SimpleNamespace(cfg=SimpleNamespace(workers=default_workers() * 2))
+
+    post_fork(server, worker=None)
+
+    assert password_hashing_pool.max_workers == 1
@@ -1,9 +1,14 @@
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
-from app.schemas.transport import BalanceResponse, RechargeRequest
+from app.schemas.transport import BalanceResponse, BatchRechargeItem, RechargeRequest
+from app.schemas.user import User as UserSchema
 from app.models.user import User as UserModel
+from app.models.transport import TransportLedgerEntry
+from app.repos.transport import TransportRepository
+from app.services.transport import TransportService
 
 
 def test_get_transport_balance_successful(client: TestClient, user_auth_token: str, reset_transport_balances):
@@ -76,7 +81,7 @@ def test_recharge_transport_balance_unauthorized(client: TestClient):
 
 def test_recharge_transport_balance_invalid_amount(client: TestClient, user_auth_token: str, reset_transport_balances):
     """
-    Testa a tentativa de recarregar saldo com um valor inválido (zero ou negativo).
+    Testa a tentativa de recarregar saldo com um valor inválido (zero, negativo ou com frações de centavo).
     Deve retornar 400 Bad Request.
     """
     
@@ -101,6 +106,14 @@ def test_recharge_transport_balance_invalid_amount(client: TestClient, user_auth
     assert response_negative.status_code == 400
     assert "detail" in response_negative.json()
 
+    # Testa com frações de centavo, que o saldo não guardaria
+    response_sub_cent = client.post(
+        "/api/v1/transport/recharge/",
+        json={"amount": 0.004},
+        headers={"Authorization": user_auth_token}
+    )
+    assert response_sub_cent.status_code == 400
+
 
 def test_recharge_and_get_balance(client: TestClient, user_auth_token: str, reset_transport_balances):
     """
@@ -132,3 +145,125 @@ def test_recharge_and_get_balance(client: TestClient, user_auth_token: str, rese
     assert response_final.status_code == 200
     assert response_final.json()["balance"] == recharge_amount
 
+
+def test_recharge_idempotency_key(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str, reset_transport_balances):
+    """
+    Testa que repetir uma recarga com o mesmo Idempotency-Key não credita o valor duas vezes.
+    """
+    headers = {"Authorization": user_auth_token, "Idempotency-Key": "recharge-123"}
+    recharge_data = RechargeRequest(amount=20.0)
+
+    for _ in range(2):
+        response = client.post("/api/v1/transport/recharge/", json=recharge_data.model_dump(), headers=headers)
+        assert response.status_code == 200
+        assert response.json()["balance"] == 20.0
+
+    response = client.post(
+        "/api/v1/transport/recharge/",
+        json=RechargeRequest(amount=5.0).model_dump(),
+        headers={"Authorization": user_auth_token}
+    )
+    assert response.json()["balance"] == 25.0
+
+    entries = db.query(TransportLedgerEntry).filter(TransportLedgerEntry.user_id == test_user.id).order_by(TransportLedgerEntry.id).all()
+    assert [(entry.amount, entry.balance_after) for entry in entries] == [(20.0, 20.0), (5.0, 25.0)]
+
+
+def test_recharge_idempotency_key_reused_with_other_amount(client: TestClient, user_auth_token: str, reset_transport_balances):
+    """
+    Testa que reutilizar um Idempotency-Key com outro valor retorna 409 Conflict.
+    """
+    headers = {"Authorization": user_auth_token, "Idempotency-Key": "recharge-456"}
+
+    response = client.post("/api/v1/transport/recharge/", json={"amount": 10.0}, headers=headers)
+    assert response.status_code == 200
+
+    response = client.post("/api/v1/transport/recharge/", json={"amount": 99.0}, headers=headers)
+    assert response.status_code == 409
+
+
+def test_recharge_batch(client: TestClient, db: Session, test_user: UserModel, user_auth_token: str, reset_transport_balances):
+    """
+    Testa a recarga em lote feita por um administrador, com itens válidos e inválidos.
+    """
+    test_user.is_superuser = True
+    other_user = UserModel(email="rider@example.com", hashed_password="hashedpassword")
+    db.add(other_user)
+    db.flush()
+    # Access tokens carry is_superuser: log in again to get one with the new role
+    response = client.post("/api/v1/auth/login", json={"email": test_user.email, "password": "testpassword"})
+    user_auth_token = f"Bearer {response.json()['access_token']}"
+
+    batch = {"items": [
+        {"user_id": test_user.id, "amount": 10.0},
+        {"user_id": other_user.id, "amount": 7.5},
+        {"user_id": test_user.id, "amount": 2.5},
+        {"user_id": other_user.id, "amount": -1.0},
+        {"user_id": 9999, "amount": 5.0},
+    ]}
+    response = client.post("/api/v1/transport/recharge/batch", json=batch, headers={"Authorization": user_auth_token})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["status"] for r in results] == ["applied", "applied", "applied", "rejected", "rejected"]
+    assert [r["balance"] for r in results[:3]] == [10.0, 7.5, 12.5]
+    assert results[4]["detail"] == "User not found"
+
+    response = client.get("/api/v1/transport/balance/", headers={"Authorization": user_auth_token})
+    assert response.json()["balance"] == 12.5
+    assert db.query(TransportLedgerEntry).filter(TransportLedgerEntry.user_id == other_user.id).count() == 1
+
+
+def test_recharge_batch_requires_superuser(client: TestClient, test_user: UserModel, user_auth_token: str, reset_transport_balances):
+    """
+    Testa que usuários comuns não podem fazer recargas em lote (403 Forbidden).
+    """
+    batch = {"items": [{"user_id": test_user.id, "amount": 10.0}]}
+    response = client.post("/api/v1/transport/recharge/batch", json=batch, headers={"Authorization": user_auth_token})
+
+    assert response.status_code == 403
+
+
+def test_recharge_batch_upserts_balances_in_user_order(db: Session, test_user: UserModel, reset_transport_balances):
+    """
+    Testa que o upsert em lote grava os saldos na ordem de user_id, qualquer que seja a
+    ordem dos itens, para que lotes concorrentes travem as linhas na mesma ordem.
+    """
+    other_user = UserModel(email="rider@example.com", hashed_password="hashedpassword")
+    db.add(other_user)
+    db.flush()
+    user_ids = sorted([test_user.id, other_user.id])
+
+    upserted = []
+
+    def capture_upsert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO transport_balances"):
+            # Multi-row VALUES: (user_id, balance) per row
+            upserted.append(list(parameters[0::2]))
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", capture_upsert)
+    try:
+        repo = TransportRepository(db)
+        repo.recharge_many([(user_ids[1], 5.0), (user_ids[0], 1.0)])
+        repo.recharge_many([(user_ids[0], 2.0), (user_ids[1], 3.0)])
+    finally:
+        event.remove(connection, "before_cursor_execute", capture_upsert)
+
+    assert upserted == [user_ids, user_ids]
+
+
+def test_recharge_batch_keeps_cents(db: Session, test_user: UserModel, reset_transport_balances):
+    """
+    Testa que os saldos do lote são calculados em centavos, como são gravados.
+    """
+    balances = TransportRepository(db).recharge_many([(test_user.id, 0.1), (test_user.id, 0.7), (test_user.id, 0.2)])
+
+    assert balances == [0.1, 0.8, 1.0]
+    assert [entry.balance_after for entry in db.query(TransportLedgerEntry).order_by(TransportLedgerEntry.id)] == balances
+
+    results = TransportService(TransportRepository(db)).recharge_batch(
+        UserSchema.model_validate(test_user).model_copy(update={"is_superuser": True}),
+        [BatchRechargeItem(user_id=test_user.id, amount=0.004)],
+    )
+    assert (results[0].status, results[0].detail) == ("rejected", "Top-up amount must have at most 2 decimal places")
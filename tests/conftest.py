@@ -13,6 +13,8 @@ TEST_DATABASE_URL = "sqlite:///:memory:"
 # This attempts to ensure that when app.db.session is imported,
 # it uses this URL for the engine.
 os.environ['DATABASE_URL'] = TEST_DATABASE_URL
+# The lifespan would sync revoked tokens from the app's own engine, not the test one
+os.environ['REVOCATION_SYNC_SECONDS'] = '0'
 # --- End Global Override ---
 
 
@@ -24,17 +26,21 @@ from app.db.base_class import Base
 # Import ORM models to ensure they are registered with Base
 from app.models.user import User
 from app.models.document import Document
+from app.models.transport import TransportBalance, TransportLedgerEntry
 # Import hashing function for creating test users
 from app.core.hashing import get_password_hash
 
 from app.models.user import User as UserModel
 
-# Import mock data if used in services (like transport)
-from app.services.transport import mock_balances
-
 # Import the actual get_db dependency from the application
 from app.db.session import get_db
 
+from app.core.security import verified_token_cache
+from app.core.revocation import revocation_list
+
+from app.routes.documents import get_storage
+from app.storage import LocalStorage
+
 
 @pytest.fixture(scope="session")
 def db_engine():
@@ -138,9 +144,33 @@ def user_auth_token(client: TestClient, test_user: UserModel):
     return f"Bearer {token_data['access_token']}"
 
 @pytest.fixture(scope="function")
-def reset_transport_balances():
+def reset_transport_balances(db: Session):
+    """
+    Fixture to start each test with an empty transport ledger (function scope).
+    """
+    db.query(TransportLedgerEntry).delete()
+    db.query(TransportBalance).delete()
+    db.flush()
+    yield
+
+@pytest.fixture(autouse=True)
+def clear_verified_token_cache():
     """
-    Fixture to reset the in-memory mock_balances before each test (function scope).
+    Fixture to empty the verified-token cache and the revocation list between tests (function scope).
+    SQLite reuses user ids after each rollback, so cached tokens must not leak across tests.
     """
-    mock_balances.clear()
+    verified_token_cache.clear()
+    revocation_list.clear()
     yield
+    verified_token_cache.clear()
+    revocation_list.clear()
+
+@pytest.fixture(scope="function")
+def local_storage(tmp_path):
+    """
+    Fixture for document files stored in a temporary directory (function scope).
+    """
+    storage = LocalStorage(str(tmp_path / "storage"))
+    app.dependency_overrides[get_storage] = lambda: storage
+    yield storage
+    app.dependency_overrides.pop(get_storage, None)